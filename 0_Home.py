@@ -73,6 +73,15 @@ def load_pages():
             )
             is_admin = False
 
+        catalog = client.get_function_catalog(
+            namespace='*' if is_admin else None,
+            functions=[
+                function_ref
+                for functions_namespaced in functions.values()
+                for function_ref in functions_namespaced
+            ],
+        )
+
     # Load cache items
     function_selected = st.session_state.get(f'/{user_session}/task', None)
     plugin_selected = st.session_state.get(f'/{user_session}/plugin', None)
@@ -111,11 +120,7 @@ def load_pages():
                             st.experimental_rerun()
 
                 # Dash Function
-                for function_ref in functions.get(namespace, []):
-                    function = client.get_function(
-                        namespace=function_ref.namespace if is_admin else None,
-                        name=function_ref.name,
-                    )
+                for function in catalog.get(namespace, []):
                     if st.button(
                         label=function.title(),
                         key=f'/{user_session}/task/{function.namespace()}/{function.name()}',
@@ -0,0 +1,242 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+import os
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+from dash.metrics import Metrics
+
+
+class NotModified(Exception):
+    '''
+    Raised by a fetch when the cached entry is still valid (HTTP 304).
+    '''
+
+
+class Unavailable(Exception):
+    '''
+    Raised by a fetch when the API is known to be unhealthy.
+
+    The cached entry, if any, is served regardless of its age.
+    '''
+
+
+class SingleFlight:
+    '''
+    Coalesces the identical calls in flight into a single one.
+
+    The first caller of a key executes the call, and the others wait for
+    its result (or its exception).
+    '''
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._calls[key] = Future()
+        if not is_leader:
+            return future.result()
+
+        try:
+            value = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class CacheEntry:
+    def __init__(
+        self, value: Any, validators: dict[str, str],
+        ttl: float, stale_ttl: float,
+    ) -> None:
+        now = time.monotonic()
+        self.value = value
+        self.validators = validators
+        self.expires_at = now + ttl
+        self.stale_until = now + ttl + stale_ttl
+        self.refreshing = False
+
+
+class ResponseCache:
+    '''
+    A shared cache of the decoded API responses.
+
+    Entries are keyed on the caller identity together with the request, and
+    expire depending on the family of the endpoint. Once expired, an entry is
+    still served for ``stale_ttl`` seconds while a single background refresh
+    takes place, so that callers never block on a synchronized expiry.
+
+    A fetch receives the conditional request headers built from the
+    validators (``ETag``, ``Last-Modified``) of the previous response, and
+    returns the decoded value together with its new validators. If it raises
+    ``NotModified``, the already decoded value is kept.
+
+    Concurrent fetches of the same entry share a single outbound call.
+    '''
+
+    # Matched in order
+    FAMILIES = ['job', 'model', 'task', 'user']
+
+    DEFAULT_TTLS = {
+        'job': 10.0,
+        'model': 60.0,
+        'task': 30.0,
+        'user': 30.0,
+    }
+
+    def __init__(
+        self, *,
+        ttls: dict[str, float] | None = None,
+        default_ttl: float | None = None,
+        stale_ttl: float | None = None,
+        max_entries: int | None = None,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self._ttls = {
+            family: float(
+                os.environ.get(f'DASH_CACHE_TTL_{family.upper()}')
+                or ttl
+            )
+            for family, ttl in self.DEFAULT_TTLS.items()
+        }
+        self._ttls.update(ttls or {})
+        self._default_ttl = default_ttl or float(
+            os.environ.get('DASH_CACHE_TTL') or '30',
+        )
+        self._stale_ttl = stale_ttl or float(
+            os.environ.get('DASH_CACHE_STALE_TTL') or '300',
+        )
+        self._max_entries = max_entries or int(
+            os.environ.get('DASH_CACHE_MAX_ENTRIES') or '4096',
+        )
+
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._metrics = metrics
+
+    @classmethod
+    def family(cls, path: str) -> str | None:
+        for family in cls.FAMILIES:
+            if f'/{family}/' in path:
+                return family
+        return None
+
+    def ttl(self, path: str) -> float:
+        return self._ttls.get(self.family(path) or '', self._default_ttl)
+
+    def get(
+        self, *, identity: str, key: Hashable, path: str,
+        fetch: Callable[[dict[str, str]], tuple[Any, dict[str, str]]],
+    ) -> Any:
+        key = (identity, path, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if now < entry.expires_at:
+                    self._observe(path, 'hit')
+                    return entry.value
+                if now < entry.stale_until:
+                    self._observe(path, 'stale')
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, path, entry, fetch),
+                            daemon=True,
+                        ).start()
+                    return entry.value
+
+        self._observe(path, 'miss')
+        return self._flights.do(
+            key, lambda: self._fetch(key, path, entry, fetch),
+        )
+
+    def invalidate(self, *, identity: str, path: str) -> None:
+        '''
+        Drops the entries of the caller that belong to the same family.
+        '''
+        family = self.family(path)
+        with self._lock:
+            for key in [
+                key for key in self._entries
+                if key[0] == identity and self.family(key[1]) == family
+            ]:
+                del self._entries[key]
+
+    def _fetch(
+        self, key: Hashable, path: str, entry: CacheEntry | None,
+        fetch: Callable[[dict[str, str]], tuple[Any, dict[str, str]]],
+    ) -> Any:
+        if entry is None:
+            value, validators = fetch({})
+        else:
+            try:
+                value, validators = fetch(_conditional_headers(
+                    entry.validators,
+                ))
+            except NotModified:
+                self._observe(path, 'not_modified')
+                value, validators = entry.value, entry.validators
+            except Unavailable:
+                self._observe(path, 'unavailable')
+                entry.refreshing = False
+                return entry.value
+
+        self._put(key, path, value, validators)
+        return value
+
+    def _observe(self, path: str, result: str) -> None:
+        if self._metrics is not None:
+            self._metrics.observe_cache(path=path, result=result)
+
+    def _put(
+        self, key: Hashable, path: str,
+        value: Any, validators: dict[str, str],
+    ) -> None:
+        entry = CacheEntry(
+            value=value,
+            validators=validators,
+            ttl=self.ttl(path),
+            stale_ttl=self._stale_ttl,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _refresh(
+        self, key: Hashable, path: str, entry: CacheEntry,
+        fetch: Callable[[dict[str, str]], tuple[Any, dict[str, str]]],
+    ) -> None:
+        try:
+            self._flights.do(
+                key, lambda: self._fetch(key, path, entry, fetch),
+            )
+        except Exception:
+            # Keep serving the stale entry; retry on the next access
+            entry.refreshing = False
+
+
+def _conditional_headers(validators: dict[str, str]) -> dict[str, str]:
+    headers = {}
+    if 'ETag' in validators:
+        headers['If-None-Match'] = validators['ETag']
+    if 'Last-Modified' in validators:
+        headers['If-Modified-Since'] = validators['Last-Modified']
+    return headers
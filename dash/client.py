@@ -1,16 +1,42 @@
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import hashlib
+from itertools import islice
+import json
 import os
-from typing import Any
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Iterable, Iterator, TypeVar
+from weakref import WeakKeyDictionary
 
-import requests
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from streamlit.web.server.websocket_headers import _get_websocket_headers
 
+from dash.cache import NotModified, ResponseCache, Unavailable
 from dash.data.function import DashFunction
 from dash.data.job import DashJob
 from dash.data.model import DashModel
 from dash.data.resource import ResourceRef
 from dash.data.session import SessionRef
 from dash.data.user import User
+from dash.metrics import get_metrics
+from dash.transport import StatusError, Transport
+
+K = TypeVar('K')
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class UnknownOutcome(Exception):
+    '''
+    Raised when a request has failed after it may have been processed.
+    '''
+
+    def __init__(self, error: Exception) -> None:
+        super().__init__(f'Unknown outcome, check before resubmitting: {error}')
+        self.error = error
 
 
 class DashClient:
@@ -18,15 +44,27 @@ class DashClient:
         @st.cache_resource()
         def init() -> 'DashClient':
             client = object.__new__(cls)
-            client.__init__()
+            client._setup()
             return client
 
         return init()
 
     def __init__(self) -> None:
-        self._session = requests.Session()
+        # Python calls it on every `DashClient()`; keep the shared state
+        pass
+
+    def _setup(self) -> None:
         self._host = os.environ.get('DASH_HOST') \
             or 'https://mobilex.kr/dash/api/'
+        self._max_workers = int(
+            os.environ.get('DASH_CLIENT_MAX_WORKERS') or '16',
+        )
+
+        self._transport = Transport(pool_size=2 * self._max_workers)
+
+        # Shared by all sessions
+        self._metrics = get_metrics()
+        self._cache = ResponseCache(metrics=self._metrics)
 
     def __reduce__(self):
         return ()
@@ -36,39 +74,63 @@ class DashClient:
         method: str, path: str, value: Any = None,
         ok: bool = False,
     ) -> Any:
-        def call(
-            namespace: str | None,
-            method: str, path: str, value: Any = None,
-            ok: bool = False,
-        ):
-            headers = _get_websocket_headers() or {}
-            headers_pass_through = [
-                'Authorization',
-                'Cookie',
-            ]
-
-            headers = {
-                header: headers.get(header, None)
-                for header in headers_pass_through
-            }
-            if namespace:
-                headers['X-ARK-NAMESPACE'] = namespace
+        headers = _get_websocket_headers() or {}
+        headers_pass_through = [
+            'Authorization',
+            'Cookie',
+        ]
 
-            response = self._session.request(
+        headers = {
+            header: headers.get(header, None)
+            for header in headers_pass_through
+        }
+        identity = _hash_identity(headers)
+        if namespace:
+            headers['X-ARK-NAMESPACE'] = namespace
+
+        def call(conditional: dict[str, str]) -> tuple[Any, dict[str, str]]:
+            started_at = time.perf_counter()
+            try:
+                with self._metrics.in_flight(method=method, path=path):
+                    response = self._transport.request(
+                        method=method,
+                        url=f'{self._host}{path}',
+                        path=path,
+                        headers={**headers, **conditional},
+                        json=value,
+                    )
+            except Exception:
+                self._metrics.observe_request(
+                    method=method,
+                    path=path,
+                    status='error',
+                    latency=time.perf_counter() - started_at,
+                    size=None,
+                )
+                raise
+            self._metrics.observe_request(
                 method=method,
-                url=f'{self._host}{path}',
-                headers=headers,
-                json=value,
+                path=path,
+                status=str(response.status_code),
+                latency=time.perf_counter() - started_at,
+                size=len(response.content),
             )
-            print(response.text)
 
+            if response.status_code == 304 and conditional:
+                raise NotModified()
             if response.status_code != 200:
-                raise Exception(
+                raise StatusError(
                     f'Failed to execute {path}: status code [{response.status_code}]',
+                    status_code=response.status_code,
                 )
 
+            validators = {
+                header: response.headers[header]
+                for header in ['ETag', 'Last-Modified']
+                if header in response.headers
+            }
             if ok:
-                return None
+                return None, validators
 
             if response.text:
                 data = response.json()
@@ -77,7 +139,7 @@ class DashClient:
 
             if response.status_code == 200:
                 if 'spec' in data:
-                    return data['spec']
+                    return data['spec'], validators
                 raise Exception(f'Failed to execute {path}: no output')
             if 'spec' in data:
                 raise Exception(f'Failed to execute {path}: {data["spec"]}')
@@ -85,33 +147,16 @@ class DashClient:
                 f'Failed to execute {path}: status code [{response.status_code}]')
 
         if method in ['GET', 'OPTION']:
-            @st.cache_data(ttl=30)
-            def call_cached(
-                namespace: str | None,
-                method: str, path: str, value: Any = None,
-                ok: bool = False,
-            ):
-                return call(
-                    namespace=namespace,
-                    method=method,
-                    path=path,
-                    value=value,
-                    ok=ok,
-                )
-            return call_cached(
-                namespace=namespace,
-                method=method,
+            return self._cache.get(
+                identity=identity,
+                key=(namespace, method, json.dumps(value, sort_keys=True), ok),
                 path=path,
-                value=value,
-                ok=ok,
+                fetch=call,
             )
-        return call(
-            namespace=namespace,
-            method=method,
-            path=path,
-            value=value,
-            ok=ok,
-        )
+
+        data, _ = call({})
+        self._cache.invalidate(identity=identity, path=path)
+        return data
 
     def user_session(self) -> int:
         cookie = (_get_websocket_headers() or {}).get('Cookie')
@@ -176,6 +221,35 @@ class DashClient:
             )
         ]
 
+    def iter_job_list(
+        self, *, namespace: str | None = None,
+        limit: int = 100,
+    ) -> Iterator[list[DashJob]]:
+        return _iter_pages(
+            self._call_raw(
+                namespace=namespace,
+                method='GET',
+                path=f'/job/',
+            ),
+            cls=DashJob,
+            limit=limit,
+        )
+
+    def iter_job_list_with_function_name(
+        self, *, namespace: str | None = None,
+        function_name: str,
+        limit: int = 100,
+    ) -> Iterator[list[DashJob]]:
+        return _iter_pages(
+            self._call_raw(
+                namespace=namespace,
+                method='GET',
+                path=f'/task/{function_name}/job/',
+            ),
+            cls=DashJob,
+            limit=limit,
+        )
+
     def post_job(
         self, *, namespace: str | None = None,
         function_name: str, value: Any,
@@ -203,6 +277,89 @@ class DashClient:
             )
         ]
 
+    def post_job_batch_chunked(
+        self, *, payload: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        max_retries: int | None = None,
+    ) -> Iterator[tuple[list[int], list[DashJob] | Exception]]:
+        '''
+        Submits the batch in chunks, yielding the rows of each completed chunk
+        together with the created jobs (or the error).
+
+        At most ``DASH_CLIENT_MAX_WORKERS`` chunks are in flight, and the
+        payload is consumed only as the window frees up. As the submission
+        is not idempotent, a failed chunk is retried only if it has provably
+        not been processed (e.g. 429 or 503), and is bisected only if it has
+        been rejected (4xx) so that only the bad rows are reported. Any other
+        failure (e.g. a timeout) is reported as an ``UnknownOutcome``, as the
+        jobs may have been created anyway.
+        '''
+        chunk_size = chunk_size or int(
+            os.environ.get('DASH_BATCH_CHUNK_SIZE') or '100',
+        )
+        max_retries = max_retries if max_retries is not None else int(
+            os.environ.get('DASH_BATCH_MAX_RETRIES') or '2',
+        )
+        backoff = float(
+            os.environ.get('DASH_HTTP_RETRY_BACKOFF') or '0.2',
+        )
+
+        rows = enumerate(payload)
+        chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+
+        @_with_script_run_ctx
+        def post(values: list[Any], attempt: int) -> list[DashJob]:
+            if attempt:
+                time.sleep(random.uniform(0, backoff * 2 ** attempt))
+            return self.post_job_batch(payload=values)
+
+        with ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix='dash-client',
+        ) as executor:
+            pending = {}
+
+            def submit(chunk: list[tuple[int, Any]], attempt: int) -> None:
+                future = executor.submit(
+                    post, [value for _, value in chunk], attempt,
+                )
+                pending[future] = (chunk, attempt)
+
+            while True:
+                # Fill the window
+                while len(pending) < self._max_workers:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    submit(chunk, attempt=0)
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk, attempt = pending.pop(future)
+                    try:
+                        new_jobs = future.result()
+                    except Exception as e:
+                        if Transport.is_not_processed(e):
+                            if attempt < max_retries \
+                                    and not isinstance(e, Unavailable):
+                                submit(chunk, attempt=attempt + 1)
+                            else:
+                                yield [index for index, _ in chunk], e
+                        elif isinstance(e, StatusError) \
+                                and 400 <= e.status_code < 500:
+                            if len(chunk) > 1:
+                                submit(chunk[:len(chunk) // 2], attempt=0)
+                                submit(chunk[len(chunk) // 2:], attempt=0)
+                            else:
+                                yield [index for index, _ in chunk], e
+                        else:
+                            yield [index for index, _ in chunk], \
+                                UnknownOutcome(e)
+                    else:
+                        yield [index for index, _ in chunk], new_jobs
+
     def restart_job(
         self, *, namespace: str | None = None,
         function_name: str, job_name: str,
@@ -227,6 +384,32 @@ class DashClient:
             ),
         )
 
+    def get_function_catalog(
+        self, *, namespace: str | None = None,
+        functions: list[ResourceRef] | None = None,
+    ) -> dict[str, list[DashFunction]]:
+        '''
+        Loads the specs of all given functions concurrently.
+
+        If ``functions`` is not given, they are listed first.
+        The functions are fetched within their own namespaces only if
+        ``namespace`` is given (i.e. ``'*'`` for admins).
+        '''
+        if functions is None:
+            functions = self.get_function_list(namespace=namespace)
+
+        async_client = AsyncDashClient()
+        catalog = {}
+        for function_ref, function in zip(functions, async_client.gather(*(
+            async_client.get_function(
+                namespace=function_ref.namespace if namespace else None,
+                name=function_ref.name,
+            )
+            for function_ref in functions
+        ))):
+            catalog.setdefault(function_ref.namespace, []).append(function)
+        return catalog
+
     def get_function_list(
         self, *, namespace: str | None = None,
     ) -> list[ResourceRef]:
@@ -361,6 +544,240 @@ class DashClient:
         )
 
 
+class AsyncDashClient:
+    '''
+    Runs the DASH API calls within an asyncio loop.
+
+    Each call is executed on a worker thread, and the number of concurrent
+    calls per event loop is bounded by ``max_concurrency``.
+    '''
+
+    def __init__(self, *, max_concurrency: int | None = None) -> None:
+        self._client = DashClient()
+        self._max_concurrency = max_concurrency or self._client._max_workers
+        self._limiters: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore,
+        ] = WeakKeyDictionary()
+
+    def _limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limiter = self._limiters.get(loop)
+        if limiter is None:
+            limiter = self._limiters[loop] = asyncio.Semaphore(
+                self._max_concurrency,
+            )
+        return limiter
+
+    async def _call(self, func: Callable[..., R], **kwargs: Any) -> R:
+        async with self._limiter():
+            return await asyncio.to_thread(
+                _with_script_run_ctx(func),
+                **kwargs,
+            )
+
+    def gather(
+        self, *aws: Awaitable[T],
+        return_exceptions: bool = False,
+    ) -> list[T]:
+        '''
+        Awaits all the given calls from a synchronous (streamlit) context.
+        '''
+        async def gather_all() -> list[T]:
+            return await asyncio.gather(
+                *aws,
+                return_exceptions=return_exceptions,
+            )
+
+        return asyncio.run(gather_all())
+
+    def iter_completed(
+        self, aws: dict[K, Awaitable[T]],
+    ) -> Iterator[tuple[K, T | Exception]]:
+        '''
+        Yields the result (or the exception) of each call as soon as it
+        completes, from a synchronous (streamlit) context.
+        '''
+        loop = asyncio.new_event_loop()
+        tasks = {
+            asyncio.ensure_future(aw, loop=loop): key
+            for key, aw in aws.items()
+        }
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = loop.run_until_complete(asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                ))
+                for task in done:
+                    error = task.exception()
+                    yield tasks[task], task.result() if error is None else error
+        finally:
+            # Stop early if the caller has stopped iterating
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(
+                *tasks,
+                return_exceptions=True,
+            ))
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    def delete_job_batch(
+        self, *, namespace: str | None = None,
+        function_name: str, job_names: list[str],
+    ) -> Iterator[tuple[str, None | Exception]]:
+        '''
+        Deletes the jobs concurrently, yielding each result as it completes.
+        '''
+        return self.iter_completed({
+            job_name: self.delete_job(
+                namespace=namespace,
+                function_name=function_name,
+                job_name=job_name,
+            )
+            for job_name in job_names
+        })
+
+    def restart_job_batch(
+        self, *, namespace: str | None = None,
+        function_name: str, job_names: list[str],
+    ) -> Iterator[tuple[str, DashJob | Exception]]:
+        '''
+        Restarts the jobs concurrently, yielding each result as it completes.
+        '''
+        return self.iter_completed({
+            job_name: self.restart_job(
+                namespace=namespace,
+                function_name=function_name,
+                job_name=job_name,
+            )
+            for job_name in job_names
+        })
+
+    async def delete_job(
+        self, *, namespace: str | None = None,
+        function_name: str, job_name: str,
+    ) -> None:
+        return await self._call(
+            self._client.delete_job,
+            namespace=namespace,
+            function_name=function_name,
+            job_name=job_name,
+        )
+
+    async def get_job(
+        self, *, namespace: str | None = None,
+        function_name: str, job_name: str,
+    ) -> DashJob:
+        return await self._call(
+            self._client.get_job,
+            namespace=namespace,
+            function_name=function_name,
+            job_name=job_name,
+        )
+
+    async def get_job_list_with_function_name(
+        self, *, namespace: str | None = None,
+        function_name: str,
+    ) -> list[DashJob]:
+        return await self._call(
+            self._client.get_job_list_with_function_name,
+            namespace=namespace,
+            function_name=function_name,
+        )
+
+    async def post_job(
+        self, *, namespace: str | None = None,
+        function_name: str, value: Any,
+    ) -> DashJob:
+        return await self._call(
+            self._client.post_job,
+            namespace=namespace,
+            function_name=function_name,
+            value=value,
+        )
+
+    async def restart_job(
+        self, *, namespace: str | None = None,
+        function_name: str, job_name: str,
+    ) -> DashJob:
+        return await self._call(
+            self._client.restart_job,
+            namespace=namespace,
+            function_name=function_name,
+            job_name=job_name,
+        )
+
+    async def get_function(
+        self, *, namespace: str | None = None,
+        name: str,
+    ) -> DashFunction:
+        return await self._call(
+            self._client.get_function,
+            namespace=namespace,
+            name=name,
+        )
+
+    async def get_model(
+        self, *, namespace: str | None = None,
+        name: str,
+    ) -> DashModel:
+        return await self._call(
+            self._client.get_model,
+            namespace=namespace,
+            name=name,
+        )
+
+    async def get_model_item(
+        self, *, namespace: str | None = None,
+        name: str, item: str,
+    ) -> DashModel:
+        return await self._call(
+            self._client.get_model_item,
+            namespace=namespace,
+            name=name,
+            item=item,
+        )
+
+    async def get_model_item_list(
+        self, *, namespace: str | None = None,
+        name: str,
+    ) -> list[DashModel]:
+        return await self._call(
+            self._client.get_model_item_list,
+            namespace=namespace,
+            name=name,
+        )
+
+
+def _hash_identity(headers: dict[str, str | None]) -> str:
+    return hashlib.sha256(
+        json.dumps(headers, sort_keys=True).encode('utf-8'),
+    ).hexdigest()
+
+
+def _iter_pages(
+    items: list[Any], *, cls: Callable[..., T], limit: int,
+) -> Iterator[list[T]]:
+    for offset in range(0, len(items), limit):
+        yield [
+            cls(data=data)
+            for data in items[offset:offset + limit]
+        ]
+
+
+def _with_script_run_ctx(func: Callable[..., R]) -> Callable[..., R]:
+    # Propagate the streamlit context (e.g. websocket headers) to the workers
+    ctx = get_script_run_ctx()
+
+    def call(*args: Any, **kwargs: Any) -> R:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func(*args, **kwargs)
+
+    return call
+
+
 def _parse_command(raw: str, option_terminal: bool) -> list[str]:
     prefix = [
         'dbus-launch',
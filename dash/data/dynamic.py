@@ -1,18 +1,92 @@
-from copy import deepcopy
+from collections import OrderedDict
 import csv
+import datetime
+from dash.data.function import DashFunction
 from dash.data.object import DashObject
 import io
-from jsonpointer import resolve_pointer, set_pointer
+from jsonpointer import resolve_pointer
+import mmap
 import pandas as pd
-from typing import Any, Union
+import threading
+from typing import IO, Any, Callable, Hashable, Iterable, Iterator, Union
 
 
-class DynamicObject(DashObject):
+class FieldPlan:
+    '''
+    The input fields of a function, with their JSON pointers parsed once.
+    '''
+
+    _cache: OrderedDict[Hashable, 'FieldPlan'] = OrderedDict()
+    _cache_lock = threading.Lock()
+    _cache_size = 256
+
     def __init__(self, fields: list[dict[str, Any]]) -> None:
+        self.fields = fields
+        self.keys = {
+            field['name']: field['name'][1:-1].replace('/', '_')
+            for field in fields
+        }
+        self.tokens = {
+            field['name']: _parse_pointer(field['name'][:-1])
+            for field in fields
+        }
+
+    @classmethod
+    def compile(cls, function: DashFunction) -> 'FieldPlan':
+        '''
+        Returns the plan of the function, cached per function version.
+        '''
+        fields = function.data['spec']['input']
+        version = resolve_pointer(function.data, '/metadata/resourceVersion', None) \
+            or repr(fields)
+        key = (
+            resolve_pointer(function.data, '/metadata/namespace', None),
+            resolve_pointer(function.data, '/metadata/name', None),
+            version,
+        )
+
+        with cls._cache_lock:
+            plan = cls._cache.get(key)
+            if plan is not None:
+                cls._cache.move_to_end(key)
+                return plan
+
+        plan = cls(fields)
+        with cls._cache_lock:
+            cls._cache[key] = plan
+            while len(cls._cache) > cls._cache_size:
+                cls._cache.popitem(last=False)
+        return plan
+
+    def build(self, values: dict[str, Any]) -> dict[str, Any]:
+        data = {}
+        for name, value in values.items():
+            if value is not None:
+                _set_tokens(data, self._tokens_of(name), value)
+        return data
+
+    def _tokens_of(self, name: str) -> list[str]:
+        tokens = self.tokens.get(name)
+        if tokens is None:
+            tokens = _parse_pointer(name[:-1])
+        return tokens
+
+
+class DynamicObject(DashObject):
+    def __init__(
+        self, fields: list[dict[str, Any]],
+        plan: FieldPlan | None = None,
+    ) -> None:
         super().__init__({})
         self._fields = fields
+        self._plan = plan or FieldPlan(fields)
         self._values = {}
 
+    @classmethod
+    def from_function(cls, function: DashFunction) -> 'DynamicObject':
+        plan = FieldPlan.compile(function)
+        return cls(plan.fields, plan=plan)
+
     def fields(self) -> list[dict[str, Any]]:
         return self._fields
 
@@ -20,15 +94,20 @@ class DynamicObject(DashObject):
         if value is None:
             return
         self._values[key] = value
+        _set_tokens(self.data, self._plan._tokens_of(key), value)
 
-        key = key[:-1]
-        pointer = key.split('/')
-        for index in range(1, len(pointer)):
-            sub_pointer = pointer[:index + 1]
-            sub_key = '/'.join(sub_pointer)
-            if resolve_pointer(self.data, sub_key, None) is None:
-                set_pointer(self.data, sub_key, {}, inplace=True)
-        set_pointer(self.data, key, value, inplace=True)
+    def from_values(self, values: dict[str, Any]) -> 'DynamicObject':
+        '''
+        Builds a new object from the values, keyed by the field names.
+        '''
+        value = type(self)(self._fields, plan=self._plan)
+        value._values = {
+            name: cell
+            for name, cell in values.items()
+            if cell is not None
+        }
+        value.data = self._plan.build(value._values)
+        return value
 
     def to_csv(self) -> str:
         record = self.to_record(default='')
@@ -54,22 +133,40 @@ class DynamicObject(DashObject):
         }
 
     def from_csv(self, data: bytes) -> list['DynamicObject']:
-        buf = io.StringIO(data.decode('utf-8'))
-        return [
-            self.from_dict(row)
-            for row in csv.DictReader(
-                f=buf,
-                delimiter=',',
-            )
+        return list(DynamicBatch(self, io.BytesIO(data)))
+
+    def from_columns(
+        self, columns: dict[str, list[Any]], *, num_rows: int,
+    ) -> list['DynamicObject']:
+        '''
+        Builds the rows from the column arrays, keyed as the records are.
+
+        The rows are kept even if none of the columns matches a field.
+        '''
+        plan = [
+            (name, self._plan.tokens[name], columns[key])
+            for name, key in self._plan.keys.items()
+            if key and key in columns
         ]
 
+        values = []
+        for index in range(num_rows):
+            value = type(self)(self._fields, plan=self._plan)
+            for name, tokens, column in plan:
+                cell = column[index]
+                if cell is None:
+                    continue
+                value._values[name] = cell
+                _set_tokens(value.data, tokens, cell)
+            values.append(value)
+        return values
+
     def from_dict(self, data: dict[str, Any]) -> 'DynamicObject':
-        value = deepcopy(self)
-        for field in self._fields:
-            key = field['name'][1:-1].replace('/', '_')
-            if key:
-                value.set(field['name'], data.get(key, None))
-        return value
+        return self.from_values({
+            name: data.get(key, None)
+            for name, key in self._plan.keys.items()
+            if key
+        })
 
     @classmethod
     def collect_to_csv(cls, rows: list['DynamicObject']) -> str:
@@ -88,6 +185,24 @@ class DynamicObject(DashObject):
         writer.writerows(records)
         return buf.getvalue()
 
+    @classmethod
+    def collect_to_parquet(cls, rows: Iterable['DynamicObject']) -> bytes:
+        pa = _import_pyarrow()
+
+        df = cls.collect_to_dataframe(rows)
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-typed columns
+            table = pa.Table.from_pandas(
+                df.astype(str).where(df.notna(), None),
+                preserve_index=False,
+            )
+
+        buf = pa.BufferOutputStream()
+        pa.parquet.write_table(table, buf, compression='zstd')
+        return buf.getvalue().to_pybytes()
+
     @classmethod
     def collect_to_dataframe(cls, rows: list['DynamicObject']) -> pd.DataFrame:
         records = [
@@ -95,3 +210,221 @@ class DynamicObject(DashObject):
             for row in rows
         ]
         return pd.DataFrame.from_records(records)
+
+
+def _parse_pointer(pointer: str) -> list[str]:
+    return [
+        token.replace('~1', '/').replace('~0', '~')
+        for token in pointer.split('/')[1:]
+    ]
+
+
+def _set_tokens(data: dict[str, Any], tokens: list[str], value: Any) -> None:
+    for token in tokens[:-1]:
+        child = data.get(token)
+        if child is None:
+            child = data[token] = {}
+        data = child
+    data[tokens[-1]] = value
+
+
+class DynamicBatch:
+    '''
+    A batch of rows, lazily parsed from a file chunk by chunk.
+
+    The file may be a CSV, a Parquet or an Arrow IPC file, detected by its
+    magic bytes. It is re-read on every pass, so that only a single chunk of
+    rows is kept in memory at once. If given, ``validate`` coerces each chunk
+    and reports its invalid cells.
+    '''
+
+    def __init__(
+        self, template: DynamicObject, file: IO[bytes],
+        chunk_size: int = 10_000,
+        validate: Callable[
+            [pd.DataFrame], tuple[pd.DataFrame, pd.DataFrame],
+        ] | None = None,
+    ) -> None:
+        self._template = template
+        self._file = file
+        self._chunk_size = chunk_size
+        self._validate = validate
+        self._len: int | None = None
+        self._errors: pd.DataFrame | None = None
+
+        self._file.seek(0)
+        magic = self._file.read(6)
+        if magic[:4] == _MAGIC_PARQUET:
+            self._format = 'parquet'
+        elif magic == _MAGIC_ARROW:
+            self._format = 'arrow'
+        else:
+            self._format = 'csv'
+
+    def __iter__(self) -> Iterator[DynamicObject]:
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def __len__(self) -> int:
+        if self._len is None:
+            if self._format == 'csv':
+                self._len = sum(
+                    len(df)
+                    for df in self._read_csv(usecols=[0])
+                )
+            elif self._format == 'parquet':
+                self._len = _open_parquet(self._file).metadata.num_rows
+            else:
+                reader = _open_arrow(self._file)
+                self._len = sum(
+                    reader.get_batch(index).num_rows
+                    for index in range(reader.num_record_batches)
+                )
+        return self._len
+
+    @property
+    def format(self) -> str:
+        return self._format
+
+    def errors(self) -> pd.DataFrame:
+        '''
+        Returns the invalid cells of all chunks.
+        '''
+        if self._errors is None:
+            errors = [
+                self._validate(df)[1]
+                for df in self._read()
+            ] if self._validate is not None else []
+            errors = [df for df in errors if not df.empty]
+            self._errors = pd.concat(errors, ignore_index=True) if errors \
+                else pd.DataFrame(columns=['Row', 'Column', 'Value', 'Error'])
+        return self._errors
+
+    def fields(self) -> list[dict[str, Any]]:
+        return self._template.fields()
+
+    def iter_chunks(self) -> Iterator[list[DynamicObject]]:
+        for df in self._read():
+            yield self._from_frame(df)
+
+    def iter_frames(self) -> Iterator[pd.DataFrame]:
+        for chunk in self.iter_chunks():
+            yield DynamicObject.collect_to_dataframe(chunk)
+
+    def preview(self, num_rows: int) -> pd.DataFrame:
+        rows = [
+            row
+            for df in self._read(nrows=num_rows)
+            for row in self._from_frame(df)
+        ]
+        return DynamicObject.collect_to_dataframe(rows)
+
+    def _from_frame(self, df: pd.DataFrame) -> list[DynamicObject]:
+        if self._validate is not None:
+            df, _ = self._validate(df)
+        return self._template.from_columns(
+            {
+                column: df[column].tolist()
+                for column in df.columns
+            },
+            num_rows=len(df),
+        )
+
+    def _read(self, nrows: int | None = None) -> Iterator[pd.DataFrame]:
+        if self._format == 'csv':
+            yield from self._read_csv(nrows=nrows)
+            return
+
+        if self._format == 'parquet':
+            batches = _open_parquet(self._file).iter_batches(
+                batch_size=self._chunk_size,
+            )
+        else:
+            reader = _open_arrow(self._file)
+            batches = (
+                batch.slice(offset, self._chunk_size)
+                for index in range(reader.num_record_batches)
+                for batch in [reader.get_batch(index)]
+                for offset in range(0, batch.num_rows, self._chunk_size)
+            )
+
+        offset = 0
+        for batch in batches:
+            if nrows is not None:
+                if offset >= nrows:
+                    return
+                batch = batch.slice(0, nrows - offset)
+            yield _arrow_to_frame(batch, offset=offset)
+            offset += batch.num_rows
+
+    def _read_csv(self, **kwargs: Any) -> Iterator[pd.DataFrame]:
+        self._file.seek(0)
+        try:
+            reader = pd.read_csv(
+                self._file,
+                delimiter=',',
+                dtype=str,
+                encoding='utf-8',
+                na_filter=False,
+                chunksize=self._chunk_size,
+                **kwargs,
+            )
+        except pd.errors.EmptyDataError:
+            return
+        with reader:
+            yield from reader
+
+
+_MAGIC_ARROW = b'ARROW1'
+_MAGIC_PARQUET = b'PAR1'
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise ImportError('Cannot find any suitable Arrow library (pyarrow)')
+
+
+def _arrow_source(file: IO[bytes]):
+    pa = _import_pyarrow()
+
+    # Read the in-memory (or memory-mapped) buffers without copying
+    if hasattr(file, 'getbuffer'):
+        return pa.BufferReader(pa.py_buffer(file.getbuffer()))
+    if isinstance(file, mmap.mmap):
+        return pa.BufferReader(pa.py_buffer(file))
+    file.seek(0)
+    return pa.PythonFile(file, mode='r')
+
+
+def _open_arrow(file: IO[bytes]):
+    return _import_pyarrow().ipc.open_file(_arrow_source(file))
+
+
+def _open_parquet(file: IO[bytes]):
+    return _import_pyarrow().parquet.ParquetFile(_arrow_source(file))
+
+
+def _arrow_to_frame(batch, offset: int) -> pd.DataFrame:
+    df = batch.to_pandas(
+        integer_object_nulls=True,
+        timestamp_as_object=True,
+    )
+    for column in df.columns:
+        series = df[column]
+        # Fill the missing cells as CSV does, keeping the others typed
+        if series.dtype == object:
+            df[column] = series.map(
+                lambda cell: cell.isoformat()
+                if isinstance(cell, (datetime.date, datetime.time))
+                else '' if cell is None
+                else cell,
+            )
+        elif series.isna().any():
+            df[column] = series.astype(object).where(series.notna(), '')
+    df.index = pd.RangeIndex(offset, offset + len(df))
+    return df
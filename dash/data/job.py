@@ -1,5 +1,127 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Iterator
+
 from dash.data.object import DashObject
+from dash.data.timestamp import parse_timestamp, to_utc
 
 
 class DashJob(DashObject):
     pass
+
+
+class JobIndex:
+    '''
+    The jobs of a fetch, indexed by their names, states and creation times.
+
+    The fields are read from the raw data once, without resolving any JSON
+    pointers. The creation times are only parsed on the first range query.
+    '''
+
+    def __init__(self, jobs: Iterable[DashJob]) -> None:
+        self._jobs: dict[str, DashJob] = {}
+        self._states: defaultdict[str | None, list[str]] = defaultdict(list)
+        self._created: list[tuple[datetime, str]] | None = None
+
+        for job in jobs:
+            name = (job.data.get('metadata') or {}).get('name')
+            if not isinstance(name, str) or not name:
+                raise Exception('cannot get the name of the object')
+            self._jobs[name] = job
+            self._states[(job.data.get('status') or {}).get('state')] \
+                .append(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._jobs
+
+    def __getitem__(self, name: str) -> DashJob:
+        return self._jobs[name]
+
+    def __iter__(self) -> Iterator[DashJob]:
+        return iter(self._jobs.values())
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def get(self, name: str) -> DashJob | None:
+        return self._jobs.get(name)
+
+    def names(self) -> list[str]:
+        return list(self._jobs)
+
+    def states(self) -> list[str]:
+        return sorted(
+            state
+            for state in self._states
+            if state is not None
+        )
+
+    def select(self, names: Iterable[str]) -> 'JobIndex':
+        '''
+        Returns the jobs of the given names, skipping the unknown ones.
+        '''
+        return JobIndex(
+            self._jobs[name]
+            for name in names
+            if name in self._jobs
+        )
+
+    def with_states(self, states: Iterable[str | None]) -> 'JobIndex':
+        '''
+        Returns the jobs in any of the given states, in their fetched order.
+        '''
+        states = list(states)
+        if len(states) == 1:
+            return self.select(self._states.get(states[0], []))
+
+        names = {
+            name
+            for state in states
+            for name in self._states.get(state, [])
+        }
+        return self.select(
+            name
+            for name in self._jobs
+            if name in names
+        )
+
+    def created_between(
+        self, since: datetime | None = None, until: datetime | None = None,
+    ) -> 'JobIndex':
+        '''
+        Returns the jobs created in ``[since, until]``, in their fetched order.
+
+        Naive bounds and timestamps are taken as UTC.
+        '''
+        if self._created is None:
+            self._created = sorted(
+                (created, name)
+                for name, job in self._jobs.items()
+                if (created := _parse_created(
+                    (job.data.get('metadata') or {}).get('creationTimestamp'),
+                )) is not None
+            )
+
+        start = 0 if since is None \
+            else bisect_left(self._created, (to_utc(since), ''))
+        end = len(self._created) if until is None \
+            else bisect_right(self._created, (to_utc(until), '\U0010ffff'))
+        names = {
+            name
+            for _, name in self._created[start:end]
+        }
+        return self.select(
+            name
+            for name in self._jobs
+            if name in names
+        )
+
+
+def _parse_created(value: object) -> datetime | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        return to_utc(parse_timestamp(value))
+    except ValueError:
+        return None
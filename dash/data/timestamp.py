@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+import re
+
+
+# Fractions of a second, which Python < 3.11 only takes of 3 or 6 digits
+_FRACTION = re.compile(r'\.(\d+)')
+
+
+def parse_timestamp(value: str) -> datetime:
+    '''
+    Parses an ISO 8601 (RFC 3339) timestamp, keeping its offset if any.
+
+    Raises:
+        ValueError: If the value is not a timestamp
+    '''
+    # Python < 3.11 cannot parse the `Z` suffix
+    if value[-1:] in ['Z', 'z']:
+        value = f'{value[:-1]}+00:00'
+    value = _FRACTION.sub(
+        lambda match: f'.{match.group(1)[:6].ljust(6, "0")}',
+        value,
+        count=1,
+    )
+    return datetime.fromisoformat(value)
+
+
+def to_utc(value: datetime) -> datetime:
+    '''
+    Converts the timestamp to UTC, taking a naive one as UTC.
+    '''
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -7,7 +7,7 @@ from dash.data.command import Command
 from dash.data.resource import ResourceRef
 from dash.data.user import User
 from dash.search import SearchEngine
-from dash.storage.local import LocalStorage
+from dash.storage import get_storage
 
 
 # Create engines
@@ -17,7 +17,7 @@ try:
 except ImportError as e:
     search_engine = None
     print(e)
-storage = LocalStorage()
+storage = get_storage()
 
 
 def draw_page(
@@ -36,6 +36,9 @@ def draw_page(
     if not user.role_admin:
         return
 
+    # Load all user-saved keys at once
+    keys = storage.get_manifest(user_name)
+
     # Store all commands
     commands: list[Command] = []
     for namespace, functions_namespaced in functions.items():
@@ -52,25 +55,24 @@ def draw_page(
             #     action=command.action,
             #     witnesses=[],
             # )
-            with storage.namespaced(storage.get_namespace(
+            for key in keys.get(storage.get_namespace(
                 user_name=user_name,
                 kind='functions',
                 namespace=namespace,
                 name=function.name,
-            )) as s:
-                for key in s.list():
-                    command = Command(
-                        kind='functions',
-                        name=function.name,
-                        namespace=function.namespace,
-                        key=key,
-                    )
-                    commands.append(command)
-                    search_engine.add_function(
-                        function=command.search_engine_function_name,
-                        action=command.action,
-                        witnesses=[],
-                    )
+            ), []):
+                command = Command(
+                    kind='functions',
+                    name=function.name,
+                    namespace=function.namespace,
+                    key=key,
+                )
+                commands.append(command)
+                search_engine.add_function(
+                    function=command.search_engine_function_name,
+                    action=command.action,
+                    witnesses=[],
+                )
 
     # Get user query
     query = st.text_input(
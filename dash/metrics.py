@@ -0,0 +1,255 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import os
+import threading
+import time
+from typing import Iterator
+
+
+_logger = logging.getLogger(__name__)
+
+# Path segments followed by the name of a resource
+_COLLECTIONS = ['item', 'job', 'model', 'task']
+
+
+def endpoint_template(path: str) -> str:
+    '''
+    Replaces the resource names of the path (e.g. ``/task/{name}/job/``).
+    '''
+    segments = path.split('/')
+    for index in range(1, len(segments)):
+        if segments[index] and segments[index - 1] in _COLLECTIONS:
+            segments[index] = '{name}'
+    return '/'.join(segments)
+
+
+class Metrics:
+    '''
+    Collects the per-endpoint metrics of the DASH API calls.
+
+    The metrics are rendered in the Prometheus text format, and are either
+    served on ``DASH_METRICS_PORT`` or written to ``DASH_METRICS_FILE``.
+    '''
+
+    BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+    def __init__(self) -> None:
+        self._latency_buckets: defaultdict[tuple[str, ...], list[int]] = \
+            defaultdict(lambda: [0] * len(self.BUCKETS))
+        self._latency_sum: defaultdict[tuple[str, ...], float] = \
+            defaultdict(float)
+        self._latency_count: defaultdict[tuple[str, ...], int] = \
+            defaultdict(int)
+        self._requests: defaultdict[tuple[str, ...], int] = defaultdict(int)
+        self._payload_sum: defaultdict[tuple[str, ...], int] = \
+            defaultdict(int)
+        self._payload_count: defaultdict[tuple[str, ...], int] = \
+            defaultdict(int)
+        self._cache_lookups: defaultdict[tuple[str, ...], int] = \
+            defaultdict(int)
+        self._in_flight: defaultdict[tuple[str, ...], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe_request(
+        self, *, method: str, path: str, status: str,
+        latency: float, size: int | None,
+    ) -> None:
+        endpoint = endpoint_template(path)
+        with self._lock:
+            key = (method, endpoint)
+            buckets = self._latency_buckets[key]
+            for index, bound in enumerate(self.BUCKETS):
+                if latency <= bound:
+                    buckets[index] += 1
+            self._latency_sum[key] += latency
+            self._latency_count[key] += 1
+            self._requests[(method, endpoint, status)] += 1
+            if size is not None:
+                self._payload_sum[key] += size
+                self._payload_count[key] += 1
+
+    def observe_cache(self, *, path: str, result: str) -> None:
+        endpoint = endpoint_template(path)
+        with self._lock:
+            self._cache_lookups[(endpoint, result)] += 1
+
+    @contextmanager
+    def in_flight(self, *, method: str, path: str) -> Iterator[None]:
+        key = (method, endpoint_template(path))
+        with self._lock:
+            self._in_flight[key] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight[key] -= 1
+
+    def render(self) -> str:
+        lines = []
+
+        def add(
+            name: str, kind: str, help: str,
+            samples: list[tuple[str, dict[str, str], float]],
+        ) -> None:
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{name}{suffix}{_format_labels(labels)} {value}')
+
+        with self._lock:
+            latency = []
+            for (method, endpoint), buckets in self._latency_buckets.items():
+                labels = {'method': method, 'endpoint': endpoint}
+                for bound, count in zip(self.BUCKETS, buckets):
+                    latency.append(
+                        ('_bucket', {**labels, 'le': str(bound)}, count),
+                    )
+                count = self._latency_count[(method, endpoint)]
+                latency += [
+                    ('_bucket', {**labels, 'le': '+Inf'}, count),
+                    ('_sum', labels, self._latency_sum[(method, endpoint)]),
+                    ('_count', labels, count),
+                ]
+
+            payload = []
+            for (method, endpoint), count in self._payload_count.items():
+                labels = {'method': method, 'endpoint': endpoint}
+                payload += [
+                    ('_sum', labels, self._payload_sum[(method, endpoint)]),
+                    ('_count', labels, count),
+                ]
+
+            add(
+                'dash_client_request_duration_seconds', 'histogram',
+                'Latency of the DASH API requests.',
+                latency,
+            )
+            add(
+                'dash_client_requests_total', 'counter',
+                'Number of the DASH API requests by status code.',
+                [
+                    ('', {'method': method, 'endpoint': endpoint, 'code': status}, count)
+                    for (method, endpoint, status), count in self._requests.items()
+                ],
+            )
+            add(
+                'dash_client_response_size_bytes', 'summary',
+                'Size of the DASH API response payloads.',
+                payload,
+            )
+            add(
+                'dash_client_cache_lookups_total', 'counter',
+                'Number of the response cache lookups by result.',
+                [
+                    ('', {'endpoint': endpoint, 'result': result}, count)
+                    for (endpoint, result), count in self._cache_lookups.items()
+                ],
+            )
+            add(
+                'dash_client_requests_in_flight', 'gauge',
+                'Number of the DASH API requests in flight.',
+                [
+                    ('', {'method': method, 'endpoint': endpoint}, count)
+                    for (method, endpoint), count in self._in_flight.items()
+                ],
+            )
+        return '\n'.join(lines) + '\n'
+
+    def export(self) -> None:
+        '''
+        Starts exporting the metrics as configured by the environment.
+        '''
+        port = os.environ.get('DASH_METRICS_PORT')
+        if port:
+            self.serve(port=int(port))
+
+        path = os.environ.get('DASH_METRICS_FILE')
+        if path:
+            self.write_periodically(
+                path=path,
+                interval=float(os.environ.get('DASH_METRICS_INTERVAL') or '15'),
+            )
+
+    def serve(self, *, port: int) -> None:
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header(
+                    'Content-Type', 'text/plain; version=0.0.4; charset=utf-8',
+                )
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        try:
+            server = ThreadingHTTPServer(('0.0.0.0', port), Handler)
+        except OSError as e:
+            # Already served by another instance
+            _logger.info('Skipping the metrics server on port %d: %s', port, e)
+            return
+        threading.Thread(
+            target=server.serve_forever,
+            name='dash-metrics',
+            daemon=True,
+        ).start()
+
+    def write(self, *, path: str) -> None:
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def write_periodically(self, *, path: str, interval: float) -> None:
+        def write_forever() -> None:
+            while True:
+                try:
+                    self.write(path=path)
+                except OSError:
+                    _logger.exception('Failed to write the metrics to %s', path)
+                time.sleep(interval)
+
+        threading.Thread(
+            target=write_forever,
+            name='dash-metrics',
+            daemon=True,
+        ).start()
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(
+            key,
+            value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'),
+        )
+        for key, value in labels.items()
+    ) + '}'
+
+
+_metrics: Metrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    '''
+    Returns the metrics of this process, exporting them on the first call.
+    '''
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+            _metrics.export()
+        return _metrics
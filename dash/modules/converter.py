@@ -1,42 +1,181 @@
-from typing import Any, Hashable
+from collections import OrderedDict
+import threading
+from typing import Any, Callable, Hashable
 import pandas as pd
-import streamlit as st
 
 
-@st.cache_data()
+DEFAULT_MAP = [
+    ('name', '/metadata/name/', False),
+    ('namespace', '/metadata/namespace/', False),
+    ('state', '/status/state/', False),
+    ('created at', '/metadata/creationTimestamp/', False),
+    ('updated at', '/status/lastUpdated/', False),
+]
+
+# Types of the columns, either `category` or `datetime`
+DEFAULT_DTYPES = {
+    'namespace': 'category',
+    'state': 'category',
+    'created at': 'datetime',
+    'updated at': 'datetime',
+}
+
+# Columns of the seconds elapsed between two `datetime` columns
+DEFAULT_DURATIONS = [
+    ('duration', 'created at', 'updated at'),
+]
+
+
+class ColumnMap:
+    '''
+    The columns of a DataFrame, with their JSON pointers compiled once.
+    '''
+
+    _cache: OrderedDict[Hashable, 'ColumnMap'] = OrderedDict()
+    _cache_lock = threading.Lock()
+    _cache_size = 64
+
+    def __init__(
+        self, map: list[tuple[str, str, bool]],
+        dtypes: dict[str, str],
+        durations: list[tuple[str, str, str]],
+    ) -> None:
+        self.columns = [
+            (renamed.title(), _compile_getter(origin), is_title)
+            for renamed, origin, is_title in map
+        ]
+        self.dtypes = {
+            renamed.title(): dtype
+            for renamed, dtype in dtypes.items()
+        }
+        self.durations = [
+            (renamed.title(), since.title(), until.title())
+            for renamed, since, until in durations
+        ]
+
+        # Frames by the identities of their items
+        self._frames: OrderedDict[
+            tuple[int, ...], tuple[list[Any], pd.DataFrame],
+        ] = OrderedDict()
+        self._frames_lock = threading.Lock()
+        self._frames_size = 16
+
+    @classmethod
+    def compile(
+        cls, map: list[tuple[str, str, bool]],
+        dtypes: dict[str, str] = DEFAULT_DTYPES,
+        durations: list[tuple[str, str, str]] = DEFAULT_DURATIONS,
+    ) -> 'ColumnMap':
+        key = (tuple(map), tuple(dtypes.items()), tuple(durations))
+        with cls._cache_lock:
+            columns = cls._cache.get(key)
+            if columns is None:
+                columns = cls._cache[key] = cls(map, dtypes, durations)
+                while len(cls._cache) > cls._cache_size:
+                    cls._cache.popitem(last=False)
+            cls._cache.move_to_end(key)
+            return columns
+
+    def extract(
+        self, items: list[dict[Hashable, Any]],
+        *, cache: bool = True,
+    ) -> pd.DataFrame:
+        '''
+        Converts the items, reusing the frame of the very same items.
+
+        The decoded responses are shared until they are refreshed, so their
+        identities are a cheap version of the items. The items are kept
+        alive together with their frame, so that the identities are never
+        reused by the other objects.
+        '''
+        if not cache:
+            return self._convert(items)
+
+        key = tuple(map(id, items))
+        with self._frames_lock:
+            cached = self._frames.get(key)
+            if cached is not None:
+                self._frames.move_to_end(key)
+                return cached[1].copy(deep=False)
+
+        df = self._convert(items)
+        with self._frames_lock:
+            self._frames[key] = (list(items), df)
+            while len(self._frames) > self._frames_size:
+                self._frames.popitem(last=False)
+        return df.copy(deep=False)
+
+    def _convert(self, items: list[dict[Hashable, Any]]) -> pd.DataFrame:
+        columns = {}
+        for renamed, get, is_title in self.columns:
+            column = pd.Series([get(item) for item in items], dtype=object)
+            if is_title:
+                column = _to_title(column)
+
+            dtype = self.dtypes.get(renamed)
+            if dtype == 'category':
+                column = column.astype('category')
+            elif dtype == 'datetime':
+                column = pd.to_datetime(
+                    column,
+                    errors='coerce',
+                    format='ISO8601',
+                    utc=True,
+                )
+            columns[renamed] = column
+
+        for renamed, since, until in self.durations:
+            if since in columns and until in columns:
+                columns[renamed] = (
+                    columns[until] - columns[since]
+                ).dt.total_seconds()
+        return pd.DataFrame(columns)
+
+
 def to_dataframe(
     *,
     items: list[dict[Hashable, Any]],
-    map: list[tuple[str, str, bool]] = [
-        ('name', '/metadata/name/', False),
-        ('state', '/status/state/', False),
-        ('created at', '/metadata/creationTimestamp/', False),
-        ('updated at', '/status/lastUpdated/', False),
-    ],
+    map: list[tuple[str, str, bool]] = DEFAULT_MAP,
+    dtypes: dict[str, str] = DEFAULT_DTYPES,
+    durations: list[tuple[str, str, str]] = DEFAULT_DURATIONS,
+    cache: bool = True,
 ) -> pd.DataFrame:
-    map_splited = [
-        (renamed.title(), origin.split('/'), is_title)
-        for renamed, origin, is_title in map
-    ]
+    '''
+    Converts the items into a DataFrame with typed columns.
+
+    Args:
+        items (list[dict[Hashable, Any]]): Decoded objects
+        map (list[tuple[str, str, bool]]): Name, JSON pointer and whether
+            to title the value, per column
+        dtypes (dict[str, str]): Types of the columns, by their names
+        durations (list[tuple[str, str, str]]): Name, start and end of the
+            derived duration (in seconds) columns
+        cache (bool): Whether to reuse the frame of the very same items
+    '''
+    return ColumnMap.compile(map, dtypes, durations) \
+        .extract(items, cache=cache)
 
-    def get_jq_style(data, keys: list[str], is_title: bool):
-        if not keys:
-            if is_title:
-                return str(data).title().replace('-', ' ')
-            return data
 
-        key = keys[0].replace('~0', '~').replace('~1', '/')
-        if not key:
-            return get_jq_style(data, keys[1:], is_title)
+def _compile_getter(pointer: str) -> Callable[[Any], Any]:
+    tokens = tuple(
+        token.replace('~1', '/').replace('~0', '~')
+        for token in pointer.split('/')
+        if token
+    )
 
-        if data is None or key not in data:
+    def get(data: Any) -> Any:
+        try:
+            for token in tokens:
+                data = data[token]
+        except (KeyError, TypeError):
             return None
-        return get_jq_style(data[key], keys[1:], is_title)
+        return data
 
-    return pd.DataFrame.from_dict({
-        renamed: [
-            get_jq_style(item, origin, is_title)
-            for item in items
-        ]
-        for renamed, origin, is_title in map_splited
-    })
+    return get
+
+
+def _to_title(column: pd.Series) -> pd.Series:
+    return column.where(
+        column.isna(),
+        column.astype(str).str.title().str.replace('-', ' ', regex=False),
+    )
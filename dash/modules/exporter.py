@@ -0,0 +1,205 @@
+import gzip
+import io
+import pandas as pd
+import streamlit as st
+import tempfile
+from typing import IO, Any, Callable, Iterable
+
+
+# Spill the exported files to the disk over this size
+_MAX_MEMORY_SIZE = 16 * 1024 * 1024
+
+# Columns without any value by then are written as text
+_MAX_PENDING_ROWS = 100_000
+
+# Arrow types of the object columns, by the kind of their values
+_ARROW_TYPES = {
+    'boolean': 'bool_',
+    'floating': 'float64',
+    'integer': 'int64',
+    'mixed-integer-float': 'float64',
+}
+
+FORMATS = {
+    'csv': '.csv',
+    'csv (gzip)': '.csv.gz',
+    'parquet': '.parquet',
+}
+
+
+def to_file(frames: Iterable[pd.DataFrame], *, format: str) -> IO[bytes]:
+    '''
+    Writes the frames chunk by chunk into a (spooled) temporary file.
+
+    Args:
+        frames (Iterable[pd.DataFrame]): Chunks sharing the same columns
+        format (str): One of ``FORMATS``
+
+    Returns:
+        IO[bytes]: The exported file, rewound
+    '''
+    file = tempfile.SpooledTemporaryFile(max_size=_MAX_MEMORY_SIZE)
+    if format == 'parquet':
+        _write_parquet(frames, file)
+    elif format == 'csv (gzip)':
+        with gzip.GzipFile(fileobj=file, mode='wb') as f:
+            _write_csv(frames, f)
+    elif format == 'csv':
+        _write_csv(frames, file)
+    else:
+        raise ValueError(f'Unsupported format: {format}')
+
+    file.seek(0)
+    return file
+
+
+def draw_export(
+    *, key: str, file_name: str,
+    frames: Callable[[], Iterable[pd.DataFrame]],
+    eager: bool = False,
+) -> None:
+    '''
+    Adds a UI to export the frames, which are only collected on demand.
+
+    Args:
+        key (str): Prefix of the widget keys
+        file_name (str): Name of the file, without any extension
+        frames (Callable[[], Iterable[pd.DataFrame]]): Chunks to export
+        eager (bool): Whether to collect the frames on every rerun
+    '''
+    format = st.selectbox(
+        label='Format',
+        key=f'{key}/format',
+        options=FORMATS.keys(),
+    )
+    file_name = f'{file_name}{FORMATS[format]}'
+    st.caption(f'* File Name: {file_name}')
+
+    if not eager and not st.button(
+        label='Export',
+        key=f'{key}/export',
+    ):
+        return
+
+    with st.spinner('Exporting...'):
+        with to_file(frames(), format=format) as file:
+            data = file.read()
+    st.download_button(
+        label='Download',
+        key=f'{key}/download',
+        data=data,
+        file_name=file_name,
+    )
+
+
+def _write_csv(frames: Iterable[pd.DataFrame], file: IO[bytes]) -> None:
+    f = io.TextIOWrapper(file, encoding='utf-8', newline='')
+    try:
+        is_first = True
+        for df in frames:
+            df.to_csv(f, header=is_first, index=False)
+            is_first = False
+        f.flush()
+    finally:
+        # Keep the underlying file open
+        f.detach()
+
+
+def _write_parquet(frames: Iterable[pd.DataFrame], file: IO[bytes]) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('Cannot find any suitable Arrow library (pyarrow)')
+
+    writer = None
+    # Chunks held back until every column has a value to type it by
+    pending: list[pd.DataFrame] = []
+    types: dict[str, Any] = {}
+
+    def write(frames: list[pd.DataFrame]) -> None:
+        nonlocal writer
+        if writer is None:
+            writer = pa.parquet.ParquetWriter(
+                file, pa.schema([
+                    (name, pa.string() if type is None else type)
+                    for name, type in types.items()
+                ]),
+                compression='zstd',
+            )
+        for df in frames:
+            writer.write_table(_to_arrow(pa, df, writer.schema))
+
+    try:
+        for df in frames:
+            if writer is not None:
+                write([df])
+                continue
+
+            # Fix the schema up front, as the chunks may not agree on it
+            for name, column in df.items():
+                if types.get(str(name)) is None:
+                    types[str(name)] = _arrow_type(pa, column)
+            pending.append(df)
+            if None in types.values() \
+                    and sum(map(len, pending)) < _MAX_PENDING_ROWS:
+                continue
+            write(pending)
+            pending.clear()
+        if pending:
+            write(pending)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _arrow_type(pa, column: pd.Series) -> Any:
+    if pd.api.types.is_bool_dtype(column):
+        return pa.bool_()
+    if pd.api.types.is_integer_dtype(column):
+        return pa.int64()
+    if pd.api.types.is_float_dtype(column):
+        return pa.float64()
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return pa.array(column.iloc[:0], from_pandas=True).type
+
+    # Typed by the values (e.g. validated cells), and as text if mixed
+    kind = _infer_dtype(column)
+    if kind == 'empty':
+        return None
+    return getattr(pa, _ARROW_TYPES.get(kind, 'string'))()
+
+
+def _infer_dtype(column: pd.Series) -> str:
+    return pd.api.types.infer_dtype(
+        column.dropna().astype(object),
+        skipna=True,
+    )
+
+
+def _to_arrow(pa, df: pd.DataFrame, schema):
+    arrays = []
+    for field in schema:
+        if field.name in df.columns:
+            column = df[field.name]
+        else:
+            column = pd.Series([None] * len(df), dtype=object)
+
+        if pa.types.is_string(field.type):
+            column = column.astype(str).where(column.notna(), None)
+        elif pa.types.is_boolean(field.type) \
+                and not pd.api.types.is_bool_dtype(column) \
+                and _infer_dtype(column) not in ['boolean', 'empty']:
+            # Arrow would take any number as a boolean
+            raise ValueError(
+                f'Column {field.name} does not match its type: {field.type}',
+            )
+
+        # Any lossy conversion (e.g. 1.5 to int64) is raised
+        try:
+            arrays.append(pa.array(column, type=field.type, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(
+                f'Column {field.name} does not match its type: {field.type}',
+            ) from e
+    return pa.Table.from_arrays(arrays, schema=schema)
@@ -6,13 +6,20 @@ from typing import Any
 import uuid
 
 from dash.client import DashClient
+from dash.data.model import DashModel
 
 
 class ValueField:
-    def __init__(self, namespace: str | None, field: dict[str, Any]) -> None:
+    def __init__(
+        self, namespace: str | None, field: dict[str, Any],
+        *, models: list[DashModel] | None = None,
+    ) -> None:
         self._namespace = namespace
         self._field = field
-        self._models = None
+        self._models = None if models is None else {
+            model.title(): model
+            for model in models
+        }
         self._value = None
 
         self._kind = None
@@ -25,6 +32,10 @@ class ValueField:
             raise Exception(
                 f'Cannot infer field type: {field["name"]}')
 
+    @property
+    def kind(self) -> str:
+        return self._kind
+
     def title(self) -> str:
         return self._field['name']
 
@@ -1,3 +1,5 @@
+import math
+import os
 from typing import Any, Hashable
 import pandas as pd
 import streamlit as st
@@ -7,17 +9,88 @@ import st_aggrid
 def dataframe(
     df: pd.DataFrame,
     show_selected: bool = True,
+    *, key: str | None = None,
+    id_column: str = 'Name',
+    page_size: int | None = None,
 ) -> list[dict[Hashable, Any]] | None:
     '''
     Adds a UI on top of a dataframe to let viewers filter columns
 
+    Filtering, sorting and paging run on the server, so that only the
+    visible page is sent to the browser. The selection is kept across the
+    pages, but only the selected rows matching the filter are returned.
+
     Args:
         df (pd.DataFrame): Original dataframe
+        key (str | None): Prefix of the widget keys
+        id_column (str): Column identifying the rows across the reruns
+        page_size (int | None): Number of rows shown at once
 
     Returns:
         pd.DataFrame: Filtered dataframe
     '''
-    grid_builder = st_aggrid.GridOptionsBuilder.from_dataframe(df)
+    key = key or '/selector/{}'.format('/'.join(map(str, df.columns)))
+    if id_column not in df.columns:
+        df = df.assign(**{id_column: df.index.astype(str)})
+    page_size = page_size or int(
+        os.environ.get('DASH_SELECTOR_PAGE_SIZE') or '100',
+    )
+
+    # Filter and sort rows
+    col_filter, col_sort, col_order = st.columns([3, 2, 1])
+    query = col_filter.text_input(
+        label='Filter',
+        key=f'{key}/filter',
+    )
+    sort_by = col_sort.selectbox(
+        label='Sort by',
+        key=f'{key}/sort',
+        options=[None, *df.columns],
+    )
+    descending = col_order.checkbox(
+        label='Descending',
+        key=f'{key}/descending',
+    )
+    view = _sort(_filter(df, query), sort_by, descending)
+    view_ids = _ids_of(view, id_column)
+
+    # Select or clear all filtered rows at once
+    selected_key = f'{key}/selected'
+    selected_ids: set[str] = st.session_state.get(selected_key, set())
+    revision_key = f'{key}/revision'
+    col_all, col_clear = st.columns(2)
+    select_all = col_all.button(
+        label=f'Select all {len(view)} filtered rows',
+        key=f'{key}/select_all',
+    )
+    clear = col_clear.button(
+        label='Clear selection',
+        key=f'{key}/clear',
+    )
+    if select_all or clear:
+        selected_ids = selected_ids | set(view_ids) if select_all else set()
+        st.session_state[selected_key] = selected_ids
+        # Redraw the grid with the new selection
+        st.session_state[revision_key] = \
+            st.session_state.get(revision_key, 0) + 1
+
+    # Select a page
+    num_pages = max(1, math.ceil(len(view) / page_size))
+    page = 1
+    if num_pages > 1:
+        page = int(st.number_input(
+            label=f'Page (of {num_pages}, {len(view)} rows)',
+            key=f'{key}/page',
+            min_value=1,
+            max_value=num_pages,
+        ))
+    view = view.iloc[(page - 1) * page_size:page * page_size]
+
+    # Restore the selection of the page
+    page_ids = _ids_of(view, id_column)
+    data = view.reset_index(drop=True)
+
+    grid_builder = st_aggrid.GridOptionsBuilder.from_dataframe(data)
     grid_builder.configure_column(
         'Name',
         headerCheckboxSelection=True,
@@ -30,29 +103,86 @@ def dataframe(
     grid_builder.configure_selection(
         selection_mode='multiple',
         use_checkbox=True,
+        pre_selected_rows=[
+            position
+            for position, id in enumerate(page_ids)
+            if id in selected_ids
+        ],
     )
     grid_builder.configure_side_bar()
     grid_options = grid_builder.build()
 
+    # A new grid is drawn whenever the page changes
+    revision = st.session_state.get(revision_key, 0)
+    grid_key = f'{key}/grid/{revision}/{page}/{sort_by}/{descending}/{query}'
     response = st_aggrid.AgGrid(
-        df,
-        data_return_mode=st_aggrid.DataReturnMode.FILTERED_AND_SORTED,
+        data,
+        data_return_mode=st_aggrid.DataReturnMode.AS_INPUT,
         enable_enterprise_modules=True,
         fit_columns_on_grid_load=False,
         gridOptions=grid_options,
         header_checkbox_selection_filtered_only=True,
         height=400,
-        update_mode=st_aggrid.GridUpdateMode.MODEL_CHANGED,
+        key=grid_key,
+        update_mode=st_aggrid.GridUpdateMode.SELECTION_CHANGED,
         use_checkbox=True,
     )
-    selected = response['selected_rows']
 
-    if selected is None or not selected:
+    # Update the selection of the page, once the grid has reported it
+    if st.session_state.get(grid_key) is not None:
+        rows = response['selected_rows']
+        rows = pd.DataFrame(rows if rows is not None else [])
+        selected_ids = (selected_ids - set(page_ids)) \
+            | set(_ids_of(rows, id_column))
+        st.session_state[selected_key] = selected_ids
+
+    # Never act on the rows hidden by the filter
+    visible_ids = selected_ids & set(view_ids)
+    hidden = len(selected_ids) - len(visible_ids)
+    st.caption(
+        f'* Selected: {len(visible_ids)} rows'
+        f' ({len(visible_ids & set(page_ids))} on this page)'
+        + (f', ignoring {hidden} hidden by the filter' if hidden else ''),
+    )
+    if not visible_ids:
         return None
 
-    selected = pd.DataFrame(selected)
-    del selected['_selectedRowNodeInfo']
+    selected = df[pd.Series(_ids_of(df, id_column), index=df.index)
+                  .isin(visible_ids)]
+    if not len(selected):
+        return None
     if show_selected:
         st.write(selected)
 
     return selected.to_dict(orient='records')
+
+
+def _ids_of(df: pd.DataFrame, id_column: str) -> list[str]:
+    if id_column not in df.columns:
+        return []
+    return df[id_column].astype(str).tolist()
+
+
+def _filter(df: pd.DataFrame, query: str) -> pd.DataFrame:
+    if not query:
+        return df
+
+    mask = pd.Series(False, index=df.index)
+    for column in df.columns:
+        mask |= df[column].astype(str).str.contains(
+            query,
+            case=False,
+            regex=False,
+        )
+    return df[mask]
+
+
+def _sort(df: pd.DataFrame, sort_by: str | None, descending: bool) -> pd.DataFrame:
+    if sort_by is None:
+        return df.iloc[::-1] if descending else df
+    return df.sort_values(
+        sort_by,
+        ascending=not descending,
+        kind='stable',
+        na_position='last',
+    )
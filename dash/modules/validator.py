@@ -0,0 +1,198 @@
+import ipaddress
+import pandas as pd
+from typing import Any, Callable
+import uuid
+
+from dash.client import DashClient
+from dash.data.timestamp import parse_timestamp
+from dash.modules.field import ValueField
+
+
+class BatchValidator:
+    '''
+    Validates and coerces the batch inputs column by column.
+
+    The columns are keyed as the records of ``DynamicObject`` are, and the
+    cells are checked against the spec of each field at once.
+    '''
+
+    _TRUE = ['true', 't', 'yes', 'y', '1']
+    _FALSE = ['false', 'f', 'no', 'n', '0']
+
+    def __init__(
+        self, namespace: str | None,
+        fields: list[dict[str, Any]],
+    ) -> None:
+        self._namespace = namespace
+        self._fields = [
+            (
+                field['name'][1:-1].replace('/', '_'),
+                ValueField(namespace, field).kind,
+                field,
+            )
+            for field in fields
+        ]
+        self._models: dict[str, set[str]] = {}
+
+    def check(self, df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        '''
+        Returns the coerced columns, and the errors of the invalid cells.
+        '''
+        df = df.copy()
+        errors = []
+        for key, kind, field in self._fields:
+            if not key or key not in df.columns:
+                continue
+            check = getattr(self, f'_check_{kind}', None)
+            if check is None:
+                continue
+
+            column = df[key]
+            is_present = column != ''
+            coerced, invalid = check(column.where(is_present), field)
+            df[key] = coerced.astype(object).where(is_present, None)
+
+            for message, is_invalid in invalid:
+                is_invalid &= is_present
+                if is_invalid.any():
+                    errors.append(pd.DataFrame({
+                        'Row': df.index[is_invalid] + 1,
+                        'Column': key,
+                        'Value': column[is_invalid],
+                        'Error': message,
+                    }))
+
+        if errors:
+            return df, pd.concat(errors, ignore_index=True)
+        return df, pd.DataFrame(columns=['Row', 'Column', 'Value', 'Error'])
+
+    # BEGIN primitive types
+
+    def _check_boolean(
+        self, column: pd.Series, field: dict[str, Any],
+    ) -> tuple[pd.Series, list[tuple[str, pd.Series]]]:
+        lowered = column.astype(str).str.lower()
+        is_true = lowered.isin(self._TRUE)
+        is_false = lowered.isin(self._FALSE)
+        return is_true.astype(object), [
+            ('not a boolean', ~(is_true | is_false)),
+        ]
+
+    def _check_integer(
+        self, column: pd.Series, field: dict[str, Any],
+    ) -> tuple[pd.Series, list[tuple[str, pd.Series]]]:
+        numbers = pd.to_numeric(column, errors='coerce')
+        is_integer = numbers.notna() & (numbers % 1 == 0)
+        coerced = numbers.where(is_integer).astype('Int64').astype(object)
+        return coerced.where(is_integer, None), [
+            ('not an integer', ~is_integer),
+            *_check_range(numbers, field['integer']),
+        ]
+
+    def _check_number(
+        self, column: pd.Series, field: dict[str, Any],
+    ) -> tuple[pd.Series, list[tuple[str, pd.Series]]]:
+        numbers = pd.to_numeric(column, errors='coerce')
+        is_number = numbers.notna()
+        return numbers.astype(object).where(is_number, None), [
+            ('not a number', ~is_number),
+            *_check_range(numbers, field['number']),
+        ]
+
+    def _check_one_of_strings(
+        self, column: pd.Series, field: dict[str, Any],
+    ) -> tuple[pd.Series, list[tuple[str, pd.Series]]]:
+        choices = field['oneOfStrings'].get('choices') or []
+        return column, [
+            (f'not one of {choices}', ~column.isin(choices)),
+        ]
+
+    # BEGIN string formats
+
+    def _check_date_time(
+        self, column: pd.Series, field: dict[str, Any],
+    ) -> tuple[pd.Series, list[tuple[str, pd.Series]]]:
+        coerced = _map_unique(
+            column,
+            lambda value: parse_timestamp(value).isoformat(),
+        )
+        return coerced, [
+            ('not a date time', coerced.isna()),
+        ]
+
+    def _check_ip(
+        self, column: pd.Series, field: dict[str, Any],
+    ) -> tuple[pd.Series, list[tuple[str, pd.Series]]]:
+        coerced = _map_unique(
+            column,
+            lambda value: str(ipaddress.ip_address(value)),
+        )
+        return coerced, [
+            ('not an IP address', coerced.isna()),
+        ]
+
+    def _check_uuid(
+        self, column: pd.Series, field: dict[str, Any],
+    ) -> tuple[pd.Series, list[tuple[str, pd.Series]]]:
+        coerced = _map_unique(
+            column,
+            lambda value: str(uuid.UUID(value)),
+        )
+        return coerced, [
+            ('not a UUID', coerced.isna()),
+        ]
+
+    # BEGIN reference types
+
+    def _check_model(
+        self, column: pd.Series, field: dict[str, Any],
+    ) -> tuple[pd.Series, list[tuple[str, pd.Series]]]:
+        model_name = field['model'].get('name')
+        if model_name not in self._models:
+            self._models[model_name] = {
+                model.name()
+                for model in DashClient().get_model_item_list(
+                    namespace=self._namespace,
+                    name=model_name,
+                )
+            }
+        return column, [
+            (
+                f'no such {model_name}',
+                ~column.isin(self._models[model_name]),
+            ),
+        ]
+
+
+def _check_range(
+    numbers: pd.Series, spec: dict[str, Any],
+) -> list[tuple[str, pd.Series]]:
+    invalid = []
+    minimum = spec.get('minimum')
+    if minimum is not None:
+        invalid.append((f'less than {minimum}', numbers < minimum))
+    maximum = spec.get('maximum')
+    if maximum is not None:
+        invalid.append((f'greater than {maximum}', numbers > maximum))
+    return invalid
+
+
+def _map_unique(
+    column: pd.Series, parse: Callable[[str], Any],
+) -> pd.Series:
+    '''
+    Parses each distinct value only once, returning ``None`` if invalid.
+    '''
+    def try_parse(value: Any) -> Any:
+        if not isinstance(value, str):
+            return None
+        try:
+            return parse(value)
+        except ValueError:
+            return None
+
+    parsed = {
+        value: try_parse(value)
+        for value in column.dropna().unique()
+    }
+    return column.map(parsed).astype(object).where(column.notna(), None)
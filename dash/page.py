@@ -1,22 +1,32 @@
-from datetime import datetime
+from datetime import datetime, time, timezone
+from itertools import islice
+import pandas as pd
 import streamlit as st
-from typing import Optional, Union
+from typing import Any, Iterator, Optional, Union
 
 from dash import common
-from dash.client import DashClient
-from dash.data.dynamic import DynamicObject
+from dash.client import AsyncDashClient, DashClient
+from dash.data.dynamic import DynamicBatch, DynamicObject
 from dash.data.function import DashFunction
-from dash.data.job import DashJob
+from dash.data.job import JobIndex
 from dash.data.user import User
-from dash.modules import selector
+from dash.modules import exporter, selector
 from dash.modules.converter import to_dataframe
 from dash.modules.field import ValueField
-from dash.storage.local import LocalStorage
+from dash.modules.validator import BatchValidator
+from dash.storage import get_storage
 
 
 # Create engines
 client = DashClient()
-storage = LocalStorage()
+async_client = AsyncDashClient()
+storage = get_storage()
+
+# Number of jobs loaded at once
+_JOB_LIST_PAGE_SIZE = 1000
+
+# Number of batch rows shown at once
+_BATCH_PREVIEW_SIZE = 100
 
 
 def draw_page(
@@ -58,31 +68,88 @@ def _draw_page_job_list(
     storage_namespace: str,
 ) -> None:
     # Get metadata
+    user_session = client.user_session()
     function_name = function.name()
 
-    # Load jobs
-    jobs = client.get_job_list_with_function_name(
+    # Load jobs page by page
+    pages_key = f'/{user_session}/task/{namespace}/{function_name}/job/pages'
+    pages = client.iter_job_list_with_function_name(
         namespace=namespace,
         function_name=function_name,
+        limit=_JOB_LIST_PAGE_SIZE,
     )
+    jobs = JobIndex(
+        job
+        for page in islice(pages, st.session_state.get(pages_key, 1))
+        for job in page
+    )
+    has_more_jobs = next(pages, None) is not None
 
     # Convert to DataFrame
     if jobs:
+        # Filter by states and creation dates
+        col_states, col_created = st.columns(2)
+        with col_states:
+            states = st.multiselect(
+                label='State',
+                key=f'/{user_session}/task/{namespace}/{function_name}/job/states',
+                options=jobs.states(),
+            )
+        with col_created:
+            created = st.date_input(
+                label='Created (UTC)',
+                key=f'/{user_session}/task/{namespace}/{function_name}/job/created',
+                value=(),
+            )
+        jobs_shown = jobs.with_states(states) if states else jobs
+        if created:
+            jobs_shown = jobs_shown.created_between(
+                since=datetime.combine(created[0], time.min, timezone.utc),
+                until=datetime.combine(created[-1], time.max, timezone.utc),
+            )
+
         df = to_dataframe(
             items=[
-                j.data for j in jobs
+                j.data for j in jobs_shown
             ],
         )
 
         # Show DataFrame and Select Data
-        jobs_selected = [
-            next(
-                job
-                for job in jobs
-                if job.name() == data['Name']
+        jobs_selected = jobs_shown.select(
+            data['Name']
+            for data in selector.dataframe(
+                df,
+                key=f'/{user_session}/task/{namespace}/{function_name}/job/selector',
+            ) or []
+        )
+
+        # Load more jobs on demand
+        if has_more_jobs and st.button(
+            label=f'Load more ({len(jobs)} jobs loaded)',
+            key=f'/{user_session}/task/{namespace}/{function_name}/job/more',
+        ):
+            st.session_state[pages_key] = \
+                st.session_state.get(pages_key, 1) + 1
+            st.experimental_rerun()
+
+        # Export all jobs page by page
+        with st.expander('Export'):
+            exporter.draw_export(
+                key=f'/{user_session}/task/{namespace}/{function_name}/job/export',
+                file_name=f'[{datetime.now().isoformat()}] {namespace}_{function.title_raw()}_jobs',
+                frames=lambda: (
+                    to_dataframe(
+                        items=[j.data for j in page],
+                        cache=False,
+                    )
+                    for page in client.iter_job_list_with_function_name(
+                        namespace=namespace,
+                        function_name=function_name,
+                        limit=_JOB_LIST_PAGE_SIZE,
+                    )
+                    if page
+                ),
             )
-            for data in selector.dataframe(df) or []
-        ]
 
         # Compose available actions
         actions = {}
@@ -111,7 +178,7 @@ def _draw_page_job_list(
 
 def _draw_page_job_delete(
     *, namespace: str | None, function: DashFunction,
-    jobs: list[DashJob],
+    jobs: JobIndex,
 ) -> None:
     # Get metadata
     user_session = client.user_session()
@@ -125,21 +192,23 @@ def _draw_page_job_delete(
         label='Delete',
         key=f'/{user_session}/task/{namespace}/{function_name}/delete',
     ):
-        with st.spinner(f'Deleting...'):
-            for job in jobs:
-                client.delete_job(
-                    namespace=namespace,
-                    function_name=function_name,
-                    job_name=job.name(),
-                )
-                with st.spinner(f'Deleting ({job.name()})...'):
-                    st.success(f'Requested Deleting ({job.name()})')
+        results = _draw_job_batch_progress(
+            label='Deleting',
+            results=async_client.delete_job_batch(
+                namespace=namespace,
+                function_name=function_name,
+                job_names=jobs.names(),
+            ),
+            total=len(jobs),
+        )
+        if results:
+            st.success(f'Requested Deleting ({len(results)} jobs)')
         common.draw_reload_is_required()
 
 
 def _draw_page_job_restart(
     *, namespace: str | None, function: DashFunction,
-    jobs: list[DashJob],
+    jobs: JobIndex,
 ) -> None:
     # Get metadata
     user_session = client.user_session()
@@ -153,29 +222,105 @@ def _draw_page_job_restart(
         label='Restart',
         key=f'/{user_session}/task/{namespace}/{function_name}/restart',
     ):
-        with st.spinner(f'Restarting...'):
-            for job in jobs:
-                new_job = client.restart_job(
-                    namespace=namespace,
-                    function_name=function_name,
-                    job_name=job.name(),
-                )
-                with st.spinner(f'Restarting ({job.name()})...'):
-                    st.success(
-                        f'Requested Restarting ({job.name()} => {new_job.name()})',
-                    )
+        results = _draw_job_batch_progress(
+            label='Restarting',
+            results=async_client.restart_job_batch(
+                namespace=namespace,
+                function_name=function_name,
+                job_names=jobs.names(),
+            ),
+            total=len(jobs),
+        )
+        if results:
+            st.success(f'Requested Restarting ({len(results)} jobs)')
+            st.dataframe(
+                data=pd.DataFrame.from_records([
+                    {
+                        'Name': job_name,
+                        'New Name': new_job.name(),
+                    }
+                    for job_name, new_job in results.items()
+                ]),
+                hide_index=True,
+            )
         common.draw_reload_is_required()
 
 
+def _draw_job_batch_progress(
+    *, label: str,
+    results: Iterator[tuple[str, Any]],
+    total: int,
+) -> dict[str, Any]:
+    # Collect the results, showing the progress
+    progress = st.progress(0.0, text=f'{label}...')
+    succeeded = {}
+    failed = {}
+    for index, (job_name, result) in enumerate(results, start=1):
+        if isinstance(result, Exception):
+            failed[job_name] = result
+        else:
+            succeeded[job_name] = result
+        progress.progress(
+            index / total,
+            text=f'{label} ({index}/{total})...',
+        )
+    progress.empty()
+
+    # Summarize the failures
+    if failed:
+        st.error(f'Failed {label} ({len(failed)} jobs)')
+        st.dataframe(
+            data=pd.DataFrame.from_records([
+                {
+                    'Name': job_name,
+                    'Error': str(error),
+                }
+                for job_name, error in failed.items()
+            ]),
+            hide_index=True,
+        )
+    return succeeded
+
+
 def _draw_page_run(
     *, namespace: str | None, function: DashFunction,
     storage_namespace: str,
 ) -> None:
+    # Load the referred models, concurrently if many
+    template = DynamicObject.from_function(function)
+    model_names = list({
+        field['model'].get('name')
+        for field in template.fields()
+        if field.get('model') is not None
+    })
+    if len(model_names) > 1:
+        models = dict(zip(model_names, async_client.gather(*(
+            async_client.get_model_item_list(
+                namespace=namespace,
+                name=model_name,
+            )
+            for model_name in model_names
+        ))))
+    else:
+        models = {
+            model_name: client.get_model_item_list(
+                namespace=namespace,
+                name=model_name,
+            )
+            for model_name in model_names
+        }
+
     # Update inputs
-    value = DynamicObject(function.data['spec']['input'])
-    for field in value.fields():
-        field = ValueField(namespace, field)
-        value.set(field.title(), field.update())
+    value = template.from_values({
+        field.title(): field.update()
+        for field in (
+            ValueField(
+                namespace, field,
+                models=models.get((field.get('model') or {}).get('name')),
+            )
+            for field in template.fields()
+        )
+    })
 
     # Show actions
     return _draw_page_action(
@@ -218,20 +363,23 @@ def _draw_page_batch_upload_as_csv(
 
     # Update inputs
     uploaded_file = st.file_uploader(
-        label='Please upload a batch `.csv` file. A .csv template cat be found on `Run` tab.',
+        label='Please upload a batch `.csv` or `.parquet` file. A .csv template cat be found on `Run` tab.',
         key=f'/{user_session}/task/{namespace}/{function_name}/batch/csv/upload',
         accept_multiple_files=False,
-        type=['csv'],
+        type=['csv', 'parquet', 'arrow', 'feather'],
     )
     if uploaded_file is None:
         return
 
     # Parse inputs
-    template = DynamicObject(function.data['spec']['input'])
-    values = template.from_csv(uploaded_file.getvalue())
+    template = DynamicObject.from_function(function)
+    values = DynamicBatch(
+        template, uploaded_file,
+        validate=BatchValidator(namespace, template.fields()).check,
+    )
 
     # Show inputs
-    st.write(DynamicObject.collect_to_dataframe(values))
+    _draw_batch_preview(values)
 
     # Show actions
     if len(values):
@@ -270,16 +418,19 @@ def _draw_page_batch_upload_database(
 
     # Update inputs
     with storage.namespaced(storage_namespace) as s:
-        data = s.get(key)
-    if data is None:
+        file = s.open(key)
+    if file is None:
         raise FileNotFoundError(f'No such key: {key}')
 
     # Parse inputs
-    template = DynamicObject(function.data['spec']['input'])
-    values = template.from_csv(data)
+    template = DynamicObject.from_function(function)
+    values = DynamicBatch(
+        template, file,
+        validate=BatchValidator(namespace, template.fields()).check,
+    )
 
     # Show inputs
-    st.write(DynamicObject.collect_to_dataframe(values))
+    _draw_batch_preview(values)
 
     # Show actions
     if key and len(values):
@@ -293,18 +444,34 @@ def _draw_page_batch_upload_database(
         )
 
 
+def _draw_batch_preview(values: DynamicBatch) -> None:
+    st.write(values.preview(_BATCH_PREVIEW_SIZE))
+    st.caption(
+        f'* Showing {min(len(values), _BATCH_PREVIEW_SIZE)} of {len(values)} rows',
+    )
+
+    # Show invalid cells
+    errors = values.errors()
+    if not errors.empty:
+        st.error(f'Invalid Inputs ({len(errors)} cells)')
+        st.dataframe(
+            data=errors,
+            hide_index=True,
+        )
+
+
 def _draw_page_action(
     *, namespace: str | None, function: DashFunction,
     storage_namespace: str,
     prefix: str,
-    values: Union[DynamicObject, list[DynamicObject]],
+    values: Union[DynamicObject, DynamicBatch],
     key: Optional[str] = None,
 ) -> None:
     # Compose available actions
     st.subheader(':zap: Actions')
     actions = [
         ('Create', _draw_page_action_create),
-        ('Download as `.csv`', _draw_page_action_download_as_csv),
+        ('Download', _draw_page_action_download),
         ('Save to Database', _draw_page_action_download_database),
     ]
     if key:
@@ -330,7 +497,7 @@ def _draw_page_action_create(
     storage_namespace: str,
     prefix: str,
     key: Optional[str],
-    values: Union[DynamicObject, list[DynamicObject]],
+    values: Union[DynamicObject, DynamicBatch],
 ) -> None:
     # Get metadata
     user_session = client.user_session()
@@ -340,6 +507,7 @@ def _draw_page_action_create(
     if st.button(
         label='Click here to Submit',
         key=f'/{user_session}/task/{namespace}/{function_name}/{prefix}/create',
+        disabled=isinstance(values, DynamicBatch) and not values.errors().empty,
     ):
         if isinstance(values, DynamicObject):
             value = values
@@ -351,54 +519,98 @@ def _draw_page_action_create(
                 )
             st.success(f'Created ({new_job.name()})')
         else:
-            with st.spinner('Batch Creating...'):
-                new_jobs = client.post_job_batch(
-                    payload=[
-                        {
-                            'namespace': namespace,
-                            'functionName': function_name,
-                            'value': value.data,
-                        }
-                        for value in values
-                    ],
-                )
-                new_jobs_names = ', '.join(
-                    job.name()
-                    for job in new_jobs
-                )
-                st.success(f'Created ({new_jobs_names})')
+            _draw_job_batch_create(
+                namespace=namespace,
+                function_name=function_name,
+                values=values,
+                total=len(values),
+            )
         common.draw_reload_is_required()
 
 
-def _draw_page_action_download_as_csv(
+def _draw_job_batch_create(
+    *, namespace: str | None, function_name: str,
+    values: DynamicBatch,
+    total: int,
+) -> None:
+    # Submit the chunks, showing the progress
+    progress = st.progress(0.0, text='Batch Creating...')
+    created = []
+    failed = []
+    for rows, result in client.post_job_batch_chunked(
+        payload=(
+            {
+                'namespace': namespace,
+                'functionName': function_name,
+                'value': value.data,
+            }
+            for value in values
+        ),
+    ):
+        if isinstance(result, Exception):
+            failed += [
+                {
+                    'Row': row + 1,
+                    'Error': str(result),
+                }
+                for row in rows
+            ]
+        else:
+            created += [
+                {
+                    'Row': row + 1,
+                    'Name': new_job.name(),
+                }
+                for row, new_job in zip(rows, result)
+            ]
+        done = len(created) + len(failed)
+        progress.progress(
+            min(done / total, 1.0),
+            text=f'Batch Creating ({done}/{total})...',
+        )
+    progress.empty()
+
+    # Summarize the rows
+    if created:
+        st.success(f'Created ({len(created)} jobs)')
+        st.dataframe(
+            data=pd.DataFrame.from_records(created).sort_values('Row'),
+            hide_index=True,
+        )
+    if failed:
+        st.error(f'Failed Creating ({len(failed)} rows)')
+        st.dataframe(
+            data=pd.DataFrame.from_records(failed).sort_values('Row'),
+            hide_index=True,
+        )
+
+
+def _draw_page_action_download(
     *, namespace: str | None, function: DashFunction,
     storage_namespace: str,
     prefix: str,
     key: Optional[str],
-    values: Union[DynamicObject, list[DynamicObject]],
+    values: Union[DynamicObject, DynamicBatch],
 ) -> None:
     # Get metadata
     user_session = client.user_session()
     function_name = function.name()
 
-    # Collect data
+    # Collect data chunk by chunk
     if isinstance(values, DynamicObject):
         value = values
-        data = value.to_csv()
-    else:
-        data = DynamicObject.collect_to_csv(values)
 
-    # Get filename
-    file_name = f'[{datetime.now().isoformat()}] {namespace}_{function.title_raw()}.csv'
-    st.caption(f'* File Name: {file_name}')
+        def frames() -> list[pd.DataFrame]:
+            return [value.to_dataframe()]
+    else:
+        frames = values.iter_frames
 
     # Apply
-    file_name = f'[{datetime.now().isoformat()}] {namespace}_{function.title_raw()}.csv'
-    st.download_button(
-        label='Download',
-        key=f'/{user_session}/task/{namespace}/{function_name}/{prefix}/download/csv',
-        data=data,
-        file_name=file_name,
+    exporter.draw_export(
+        key=f'/{user_session}/task/{namespace}/{function_name}/{prefix}/download',
+        file_name=f'[{datetime.now().isoformat()}] {namespace}_{function.title_raw()}',
+        frames=frames,
+        eager=isinstance(values, DynamicObject),
     )
 
 
@@ -407,7 +619,7 @@ def _draw_page_action_download_database(
     storage_namespace: str,
     prefix: str,
     key: Optional[str],
-    values: Union[DynamicObject, list[DynamicObject]],
+    values: Union[DynamicObject, DynamicBatch],
 ) -> None:
     # Get metadata
     user_session = client.user_session()
@@ -416,25 +628,32 @@ def _draw_page_action_download_database(
     # Notify the caution
     common.draw_caution_side_effect_database()
 
-    # Collect data
-    if isinstance(values, DynamicObject):
-        value = values
-        data = value.to_csv()
-    else:
-        data = DynamicObject.collect_to_csv(values)
-
     # Apply
     key = st.text_input(
         label='Save to Database',
         key=f'/{user_session}/task/{namespace}/{function_name}/{prefix}/download/database/key',
         value=key or '',
     )
+    format = st.selectbox(
+        label='Format',
+        key=f'/{user_session}/task/{namespace}/{function_name}/{prefix}/download/database/format',
+        options=['csv', 'parquet'],
+        index=1 if isinstance(values, DynamicBatch)
+        and values.format == 'parquet' else 0,
+    )
     if st.button(
         label='Save',
         key=f'/{user_session}/task/{namespace}/{function_name}/{prefix}/download/database/submit',
         disabled=not key,
     ) and key:
         with st.spinner('Saving...'):
+            # Collect data
+            rows = [values] if isinstance(values, DynamicObject) else values
+            if format == 'parquet':
+                data = DynamicObject.collect_to_parquet(rows)
+            else:
+                data = DynamicObject.collect_to_csv(rows)
+
             with storage.namespaced(storage_namespace) as s:
                 s.set(key, data)
         st.success(':floppy_disk: Saved!')
@@ -446,7 +665,7 @@ def _draw_page_action_delete_database(
     storage_namespace: str,
     prefix: str,
     key: str,
-    values: Union[DynamicObject, list[DynamicObject]],
+    values: Union[DynamicObject, DynamicBatch],
 ) -> None:
     # Get metadata
     user_session = client.user_session()
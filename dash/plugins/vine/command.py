@@ -7,12 +7,12 @@ from dash.client import DashClient
 from dash.data.user import User
 from dash.modules import selector
 from dash.modules.converter import to_dataframe
-from dash.storage.local import LocalStorage
+from dash.storage import get_storage
 
 
 # Create engines
 client = DashClient()
-storage = LocalStorage()
+storage = get_storage()
 
 
 def draw_page(
@@ -24,6 +24,7 @@ def draw_page(
 
     # Get metadata
     user_name = user.name
+    user_session = client.user_session()
 
     # Show available sessions
     st.subheader(':desktop_computer: Select')
@@ -34,6 +35,7 @@ def draw_page(
     sessions_selected = selector.dataframe(
         df=sessions,
         show_selected=False,
+        key=f'/{user_session}/plugin/{namespace}/{feature_name}/session/selector',
     )
     if not sessions_selected:
         return
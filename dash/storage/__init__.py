@@ -0,0 +1,20 @@
+import os
+
+from dash.storage.base import BaseStorage
+
+
+def get_storage() -> BaseStorage:
+    '''
+    Creates the storage backend given by ``DASH_STORAGE`` (default: local).
+    '''
+    kind = os.getenv('DASH_STORAGE') or 'local'
+    if kind == 'local':
+        from dash.storage.local import LocalStorage
+        return LocalStorage()
+    if kind == 'sqlite':
+        from dash.storage.sqlite import SQLiteStorage
+        return SQLiteStorage()
+    if kind == 's3':
+        from dash.storage.s3 import S3Storage
+        return S3Storage()
+    raise ValueError(f'Unsupported storage: {kind}')
@@ -1,5 +1,17 @@
 from abc import abstractmethod, ABCMeta
-from typing import Optional, Union
+from contextlib import AbstractContextManager, nullcontext
+import io
+import json
+from typing import IO, Iterable, NamedTuple, Optional, Union
+
+
+# Namespace of the per-user manifests
+_MANIFEST_NAMESPACE = '/.manifest'
+
+
+class StorageStat(NamedTuple):
+    size: int
+    mtime: float
 
 
 class BaseStorage(metaclass=ABCMeta):
@@ -9,6 +21,96 @@ class BaseStorage(metaclass=ABCMeta):
     def namespaced(self, namespace: str):
         return NamespacedStorage(self, namespace)
 
+    def get_namespace(
+        self,
+        user_name: str,
+        kind: str,
+        namespace: str | None,
+        name: str,
+    ) -> str:
+        return f'/{user_name}/{namespace or "_"}/{kind}/{name}'
+
+    def lock(self, namespace: str, key: str) -> AbstractContextManager:
+        '''
+        Serializes the read-modify-write cycles of an object, if supported.
+        '''
+        return nullcontext()
+
+    def get_manifest(self, user_name: str) -> dict[str, list[str]]:
+        '''
+        Returns the keys of all namespaces of the user, with a single read.
+
+        The manifest is kept up to date by the writes of ``NamespacedStorage``,
+        and is rebuilt from a listing if missing.
+        '''
+        data = self.get(_MANIFEST_NAMESPACE, user_name)
+        if data is not None:
+            return json.loads(data)
+
+        with self.lock(_MANIFEST_NAMESPACE, user_name):
+            return self._get_manifest_uncached(user_name)
+
+    def _get_manifest_uncached(self, user_name: str) -> dict[str, list[str]]:
+        # Should be called with the lock of the manifest held
+        data = self.get_uncached(_MANIFEST_NAMESPACE, user_name)
+        if data is not None:
+            return json.loads(data)
+
+        manifest: dict[str, list[str]] = {}
+        for namespace, key in self.list_prefix(f'/{user_name}'):
+            manifest.setdefault(namespace, []).append(key)
+        self.set(_MANIFEST_NAMESPACE, user_name, json.dumps(manifest))
+        return manifest
+
+    def _update_manifest(
+        self, namespace: str, values: dict[str, Optional[Union[bytes, str]]],
+    ) -> None:
+        user_name = namespace.strip('/').split('/', 1)[0]
+        if not user_name:
+            return
+
+        with self.lock(_MANIFEST_NAMESPACE, user_name):
+            manifest = self._get_manifest_uncached(user_name)
+            keys = set(manifest.get(namespace, []))
+            for key, value in values.items():
+                if value is None:
+                    keys.discard(key)
+                else:
+                    keys.add(key)
+            if keys:
+                manifest[namespace] = sorted(keys)
+            else:
+                manifest.pop(namespace, None)
+            self.set(_MANIFEST_NAMESPACE, user_name, json.dumps(manifest))
+
+    def list_many(self, namespaces: Iterable[str]) -> dict[str, list[str]]:
+        return {
+            namespace: self.list(namespace)
+            for namespace in namespaces
+        }
+
+    @abstractmethod
+    def list_prefix(self, prefix: str) -> list[tuple[str, str]]:
+        '''
+        Returns the ``(namespace, key)`` of all objects in the namespace and
+        in its descendants (e.g. all objects of a user, under ``/{user}``).
+        '''
+        raise NotImplementedError()
+
+    def get_many(
+        self, namespace: str, keys: Iterable[str],
+    ) -> dict[str, Optional[bytes]]:
+        return {
+            key: self.get(namespace, key)
+            for key in keys
+        }
+
+    def set_many(
+        self, namespace: str, values: dict[str, Optional[Union[bytes, str]]],
+    ) -> None:
+        for key, value in values.items():
+            self.set(namespace, key, value)
+
     @abstractmethod
     def list(self, namespace: str) -> list[str]:
         raise NotImplementedError()
@@ -17,10 +119,26 @@ class BaseStorage(metaclass=ABCMeta):
     def get(self, namespace: str, key: str) -> Optional[bytes]:
         raise NotImplementedError()
 
+    def get_uncached(self, namespace: str, key: str) -> Optional[bytes]:
+        '''
+        Reads the latest value, bypassing any cache that may be stale.
+        '''
+        return self.get(namespace, key)
+
     @abstractmethod
     def set(self, namespace: str, key: str, value: Optional[Union[bytes, str]]) -> None:
         raise NotImplementedError()
 
+    @abstractmethod
+    def stat(self, namespace: str, key: str) -> Optional[StorageStat]:
+        raise NotImplementedError()
+
+    def open(self, namespace: str, key: str) -> Optional[IO[bytes]]:
+        data = self.get(namespace, key)
+        if data is None:
+            return None
+        return io.BytesIO(data)
+
 
 class NamespacedStorage:
     def __init__(self, storage: BaseStorage, namespace: str) -> None:
@@ -33,6 +151,16 @@ class NamespacedStorage:
     def __exit__(self, type, value, traceback):
         pass
 
+    def list_prefix(self) -> list[tuple[str, str]]:
+        return self._storage.list_prefix(self._namespace)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Optional[bytes]]:
+        return self._storage.get_many(self._namespace, keys)
+
+    def set_many(self, values: dict[str, Optional[Union[bytes, str]]]) -> None:
+        self._storage.set_many(self._namespace, values)
+        self._storage._update_manifest(self._namespace, values)
+
     def list(self) -> list[str]:
         return self._storage.list(self._namespace)
 
@@ -40,4 +168,11 @@ class NamespacedStorage:
         return self._storage.get(self._namespace, key)
 
     def set(self, key: str, value: Optional[Union[bytes, str]]) -> None:
-        return self._storage.set(self._namespace, key, value)
+        self._storage.set(self._namespace, key, value)
+        self._storage._update_manifest(self._namespace, {key: value})
+
+    def open(self, key: str) -> Optional[IO[bytes]]:
+        return self._storage.open(self._namespace, key)
+
+    def stat(self, key: str) -> Optional[StorageStat]:
+        return self._storage.stat(self._namespace, key)
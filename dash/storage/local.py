@@ -1,13 +1,34 @@
 import base64
+from collections import OrderedDict
+from contextlib import contextmanager
+import io
+import mmap
 import os
 from pathlib import Path
 import shutil
-from typing import Optional, Union
+import tempfile
+import threading
+from typing import IO, Iterator, Optional, Union
 
-from dash.storage.base import BaseStorage
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows
+    fcntl = None
+
+from dash.storage.base import BaseStorage, StorageStat
 
 
 class LocalStorage(BaseStorage):
+    '''
+    Stores the objects as files, safely shared by several worker processes.
+
+    A write goes to a temporary file that is then renamed over the target,
+    so that readers never see a partial file, and writers of the same key
+    are serialized with an advisory lock. Reads are served from a
+    size-bounded in-process cache as long as the file is unchanged.
+    '''
+
     def __init__(self) -> None:
         super().__init__()
         self._base_dir = Path(os.getenv('DASH_DATA_DIR') or './data')
@@ -17,54 +38,168 @@ class LocalStorage(BaseStorage):
             parents=True,
         )
 
+        self._cache_size = int(
+            os.getenv('DASH_STORAGE_LOCAL_CACHE_SIZE')
+            or str(16 * 1024 * 1024),
+        )
+        self._cache: OrderedDict[
+            Path, tuple[tuple[int, int, int], bytes],
+        ] = OrderedDict()
+        self._cache_used = 0
+        self._cache_lock = threading.Lock()
+
+        # Locks held by the current thread, to make them reentrant
+        self._locks = threading.local()
+
     def __reduce__(self):
         return ()
 
-    def _get_namespaced(self, namespace: str) -> Path:
+    def _get_namespaced(self, namespace: str, create: bool = False) -> Path:
         path = self._base_dir.joinpath(f'./{namespace}')
-        path.mkdir(
-            mode=0o700,
-            exist_ok=True,
-            parents=True,
-        )
+        if create:
+            path.mkdir(
+                mode=0o700,
+                exist_ok=True,
+                parents=True,
+            )
         return path
 
-    def _get_file(self, namespace: str, key: str) -> Path:
-        parent = self._get_namespaced(namespace)
+    def _get_file(self, namespace: str, key: str, create: bool = False) -> Path:
+        parent = self._get_namespaced(namespace, create=create)
         encoded_key = base64.b64encode(key.encode('utf-8')).decode('utf-8')
         return parent.joinpath(f'./{encoded_key}.csv')
 
-    def get_namespace(
-        self,
-        user_name: str,
-        kind: str,
-        namespace: str | None,
-        name: str,
-    ) -> str:
-        return f'/{user_name}/{namespace or "_"}/{kind}/{name}'
+    @contextmanager
+    def lock(self, namespace: str, key: str) -> Iterator[None]:
+        path = self._get_file(namespace, key, create=True)
+        held: dict[Path, int] | None = getattr(self._locks, 'held', None)
+        if held is None:
+            held = self._locks.held = {}
+        if path in held or fcntl is None:
+            held[path] = held.get(path, 0) + 1
+            try:
+                yield
+            finally:
+                held[path] -= 1
+                if not held[path]:
+                    del held[path]
+            return
+
+        with open(path.with_suffix('.lock'), 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            held[path] = 1
+            try:
+                yield
+            finally:
+                del held[path]
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def list_prefix(self, prefix: str) -> list[tuple[str, str]]:
+        # Walk the directory tree once, without creating any directory
+        root = self._base_dir.joinpath(f'./{prefix}')
+        return [
+            (
+                '/' + Path(dir_path).relative_to(self._base_dir).as_posix(),
+                base64.b64decode(file_name[:-4]).decode('utf-8'),
+            )
+            for dir_path, _, file_names in os.walk(root)
+            for file_name in file_names
+            if file_name.endswith('.csv')
+        ]
 
     def list(self, namespace: str) -> list[str]:
+        path = self._get_namespaced(namespace)
+        if not path.is_dir():
+            return []
         return [
             base64.b64decode(file.name[:-4]).decode('utf-8')
-            for file in self._get_namespaced(namespace).iterdir()
+            for file in path.iterdir()
             if file.name.endswith('.csv')
         ]
 
     def get(self, namespace: str, key: str) -> Optional[bytes]:
         path = self._get_file(namespace, key)
-        if path.exists():
+        try:
             with open(path, 'rb') as f:
-                return f.read()
-        return None
+                # Renamed files are detected by their inodes
+                result = os.fstat(f.fileno())
+                version = (result.st_ino, result.st_mtime_ns, result.st_size)
+                with self._cache_lock:
+                    cached = self._cache.get(path)
+                    if cached is not None and cached[0] == version:
+                        self._cache.move_to_end(path)
+                        return cached[1]
+                value = f.read()
+        except FileNotFoundError:
+            self._invalidate(path)
+            return None
 
-    def set(self, namespace: str, key: str, value: Optional[Union[bytes, str]]) -> None:
+        self._put(path, version, value)
+        return value
+
+    def open(self, namespace: str, key: str) -> Optional[IO[bytes]]:
         path = self._get_file(namespace, key)
-        if isinstance(value, bytes):
-            with open(path, 'wb') as f:
-                f.write(value)
-        elif isinstance(value, str):
-            with open(path, 'w') as f:
-                f.write(value)
-        else:
-            if path.exists():
-                return os.remove(path)
+        if not path.exists():
+            return None
+        with open(path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                return io.BytesIO()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def set(self, namespace: str, key: str, value: Optional[Union[bytes, str]]) -> None:
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+
+        with self.lock(namespace, key):
+            path = self._get_file(namespace, key, create=True)
+            self._invalidate(path)
+            if isinstance(value, bytes):
+                # Write then rename, so that readers never see a partial file
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=path.parent,
+                    prefix='.',
+                    suffix='.tmp',
+                )
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(value)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def stat(self, namespace: str, key: str) -> Optional[StorageStat]:
+        try:
+            result = os.stat(self._get_file(namespace, key))
+        except FileNotFoundError:
+            return None
+        return StorageStat(size=result.st_size, mtime=result.st_mtime)
+
+    def _invalidate(self, path: Path) -> None:
+        with self._cache_lock:
+            cached = self._cache.pop(path, None)
+            if cached is not None:
+                self._cache_used -= len(cached[1])
+
+    def _put(
+        self, path: Path, version: tuple[int, int, int], value: bytes,
+    ) -> None:
+        if len(value) > self._cache_size:
+            return
+
+        with self._cache_lock:
+            cached = self._cache.pop(path, None)
+            if cached is not None:
+                self._cache_used -= len(cached[1])
+            self._cache[path] = (version, value)
+            self._cache_used += len(value)
+            while self._cache_used > self._cache_size:
+                _, (_, old) = self._cache.popitem(last=False)
+                self._cache_used -= len(old)
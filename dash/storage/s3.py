@@ -0,0 +1,315 @@
+import base64
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import os
+import random
+import threading
+import time
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from dash.storage.base import BaseStorage, StorageStat
+
+
+class S3Storage(BaseStorage):
+    '''
+    Stores the objects in an S3-compatible bucket, shared by all replicas.
+
+    The objects are served from a size-bounded in-memory read-through
+    cache. A cached object is trusted for ``DASH_STORAGE_S3_CACHE_TTL``
+    seconds, and is then revalidated by its ``ETag``, so that an unchanged
+    object is never downloaded again. Listings are done with a single
+    (paginated) request per namespace, are cached with the same TTL, and
+    refresh the known ``ETag``s of the cached objects.
+
+    Point ``DASH_STORAGE_S3_ENDPOINT`` to a local stand-in (e.g. MinIO or
+    ``moto_server``) to run it without AWS.
+    '''
+
+    def __init__(self) -> None:
+        super().__init__()
+        try:
+            import s3fs
+        except ImportError:
+            raise ImportError('Cannot find any suitable S3 library (s3fs)')
+
+        bucket = os.getenv('DASH_STORAGE_S3_BUCKET')
+        if not bucket:
+            raise ValueError('DASH_STORAGE_S3_BUCKET is not set')
+        prefix = (os.getenv('DASH_STORAGE_S3_PREFIX') or '').strip('/')
+        self._root = f'{bucket}/{prefix}' if prefix else bucket
+
+        self._fs = s3fs.S3FileSystem(
+            client_kwargs={
+                'endpoint_url': os.getenv('DASH_STORAGE_S3_ENDPOINT') or None,
+            },
+            # Listings are cached in ``self._listings`` instead
+            use_listings_cache=False,
+        )
+
+        self._cache_size = int(
+            os.getenv('DASH_STORAGE_S3_CACHE_SIZE') or str(64 * 1024 * 1024),
+        )
+        self._cache_ttl = float(
+            os.getenv('DASH_STORAGE_S3_CACHE_TTL') or '5',
+        )
+        self._cache: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._cache_used = 0
+        # Latest known ETags, of the cached objects only
+        self._etags: dict[str, str] = {}
+        self._listings: OrderedDict[str, tuple[float, list[str]]] = \
+            OrderedDict()
+        self._listings_size = int(
+            os.getenv('DASH_STORAGE_S3_LISTING_CACHE_SIZE') or '1024',
+        )
+        self._lock = threading.Lock()
+
+        self._max_workers = int(
+            os.getenv('DASH_STORAGE_S3_MAX_WORKERS') or '16',
+        )
+
+        self._lock_timeout = float(
+            os.getenv('DASH_STORAGE_S3_LOCK_TIMEOUT') or '30',
+        )
+        # Locks older than this are left by crashed replicas
+        self._lock_ttl = float(
+            os.getenv('DASH_STORAGE_S3_LOCK_TTL') or '60',
+        )
+        # Locks held by the current thread, to make them reentrant
+        self._locks = threading.local()
+
+    def __reduce__(self):
+        return ()
+
+    def _get_dir(self, namespace: str) -> str:
+        namespace = namespace.strip('/')
+        return f'{self._root}/{namespace}' if namespace else self._root
+
+    def _get_file(self, namespace: str, key: str) -> str:
+        encoded_key = base64.urlsafe_b64encode(key.encode('utf-8')) \
+            .decode('utf-8')
+        return f'{self._get_dir(namespace)}/{encoded_key}.csv'
+
+    @contextmanager
+    def lock(self, namespace: str, key: str) -> Iterator[None]:
+        path = f'{self._get_file(namespace, key)[:-4]}.lock'
+        held: dict[str, int] | None = getattr(self._locks, 'held', None)
+        if held is None:
+            held = self._locks.held = {}
+        if path in held:
+            held[path] += 1
+            try:
+                yield
+            finally:
+                held[path] -= 1
+            return
+
+        # Create the lock object only if it does not exist yet
+        bucket, lock_key = path.split('/', 1)
+        deadline = time.monotonic() + self._lock_timeout
+        while True:
+            try:
+                self._fs.call_s3(
+                    'put_object',
+                    Bucket=bucket,
+                    Key=lock_key,
+                    Body=b'',
+                    IfNoneMatch='*',
+                )
+                break
+            except FileExistsError:
+                pass
+
+            try:
+                locked_at = self._fs.info(path)['LastModified']
+                if (datetime.now(timezone.utc) - locked_at).total_seconds() \
+                        > self._lock_ttl:
+                    self._fs.rm_file(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Cannot lock {path}')
+            time.sleep(random.uniform(0.05, 0.2))
+
+        held[path] = 1
+        try:
+            yield
+        finally:
+            del held[path]
+            try:
+                self._fs.rm_file(path)
+            except FileNotFoundError:
+                pass
+
+    def _parse_files(
+        self, files: Iterable[dict[str, Any]],
+    ) -> list[tuple[str, str]]:
+        # Remember the ETags of the listed objects for the revalidation
+        objects = []
+        with self._lock:
+            for file in files:
+                dir, name = file['name'].rsplit('/', 1)
+                if file['type'] != 'file' or not name.endswith('.csv'):
+                    continue
+                if file['name'] in self._cache:
+                    self._etags[file['name']] = file.get('ETag')
+                objects.append((
+                    '/' + dir[len(self._root):].strip('/'),
+                    base64.urlsafe_b64decode(name[:-4]).decode('utf-8'),
+                ))
+        return objects
+
+    def list_many(self, namespaces: Iterable[str]) -> dict[str, list[str]]:
+        namespaces = list(namespaces)
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            return dict(zip(namespaces, executor.map(self.list, namespaces)))
+
+    def list_prefix(self, prefix: str) -> list[tuple[str, str]]:
+        # A single (paginated) listing without any delimiter
+        files = self._fs.find(self._get_dir(prefix), detail=True)
+        return self._parse_files(files.values())
+
+    def get_many(
+        self, namespace: str, keys: Iterable[str],
+    ) -> dict[str, Optional[bytes]]:
+        keys = list(keys)
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            return dict(zip(keys, executor.map(
+                lambda key: self.get(namespace, key),
+                keys,
+            )))
+
+    def set_many(
+        self, namespace: str, values: dict[str, Optional[Union[bytes, str]]],
+    ) -> None:
+        # Upload and delete the objects concurrently
+        uploads = {}
+        deletes = []
+        with self._lock:
+            self._listings.pop(self._get_dir(namespace), None)
+        for key, value in values.items():
+            path = self._get_file(namespace, key)
+            self._invalidate(path)
+            if isinstance(value, str):
+                value = value.encode('utf-8')
+            if isinstance(value, bytes):
+                uploads[path] = value
+            else:
+                deletes.append(path)
+
+        if uploads:
+            self._fs.pipe(uploads)
+        if deletes:
+            try:
+                self._fs.rm(deletes)
+            except FileNotFoundError:
+                pass
+
+    def list(self, namespace: str) -> list[str]:
+        dir = self._get_dir(namespace)
+        now = time.monotonic()
+        with self._lock:
+            listing = self._listings.get(dir)
+            if listing is not None and now < listing[0]:
+                self._listings.move_to_end(dir)
+                return listing[1][:]
+
+        try:
+            files = self._fs.ls(dir, detail=True)
+        except FileNotFoundError:
+            files = []
+        keys = [key for _, key in self._parse_files(files)]
+
+        with self._lock:
+            self._listings[dir] = (now + self._cache_ttl, keys)
+            self._listings.move_to_end(dir)
+            while len(self._listings) > self._listings_size:
+                self._listings.popitem(last=False)
+        return keys[:]
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        path = self._get_file(namespace, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is not None:
+                self._cache.move_to_end(path)
+                if now < entry.expires_at:
+                    return entry.value
+            etag = self._etags.pop(path, None)
+
+        # Revalidate the cached object
+        if entry is not None:
+            if etag is None:
+                try:
+                    etag = self._fs.info(path).get('ETag')
+                except FileNotFoundError:
+                    self._invalidate(path)
+                    return None
+            if etag is not None and etag == entry.etag:
+                with self._lock:
+                    entry.expires_at = now + self._cache_ttl
+                return entry.value
+
+        try:
+            with self._fs.open(path, 'rb') as f:
+                value = f.read()
+                etag = f.details.get('ETag')
+        except FileNotFoundError:
+            self._invalidate(path)
+            return None
+
+        self._put(path, _CacheEntry(
+            value=value,
+            etag=etag,
+            expires_at=now + self._cache_ttl,
+        ))
+        return value
+
+    def get_uncached(self, namespace: str, key: str) -> Optional[bytes]:
+        self._invalidate(self._get_file(namespace, key))
+        return self.get(namespace, key)
+
+    def set(self, namespace: str, key: str, value: Optional[Union[bytes, str]]) -> None:
+        return self.set_many(namespace, {key: value})
+
+    def stat(self, namespace: str, key: str) -> Optional[StorageStat]:
+        try:
+            info = self._fs.info(self._get_file(namespace, key))
+        except FileNotFoundError:
+            return None
+        return StorageStat(
+            size=info['size'],
+            mtime=info['LastModified'].timestamp(),
+        )
+
+    def _invalidate(self, path: str) -> None:
+        with self._lock:
+            self._etags.pop(path, None)
+            entry = self._cache.pop(path, None)
+            if entry is not None:
+                self._cache_used -= len(entry.value)
+
+    def _put(self, path: str, entry: '_CacheEntry') -> None:
+        if len(entry.value) > self._cache_size:
+            return
+
+        with self._lock:
+            old = self._cache.pop(path, None)
+            if old is not None:
+                self._cache_used -= len(old.value)
+            self._cache[path] = entry
+            self._cache_used += len(entry.value)
+            while self._cache_used > self._cache_size:
+                old_path, old = self._cache.popitem(last=False)
+                self._cache_used -= len(old.value)
+                self._etags.pop(old_path, None)
+
+
+class _CacheEntry:
+    def __init__(self, value: bytes, etag: Any, expires_at: float) -> None:
+        self.value = value
+        self.etag = etag
+        self.expires_at = expires_at
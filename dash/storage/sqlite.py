@@ -0,0 +1,218 @@
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from dash.storage.base import BaseStorage, StorageStat
+
+
+class SQLiteStorage(BaseStorage):
+    '''
+    Stores the objects in a single SQLite database, in the WAL mode.
+
+    The objects are indexed by ``(namespace, key)``, so that both lookups
+    and (prefix) listings are served from the primary key index.
+    '''
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._path = Path(
+            os.getenv('DASH_STORAGE_SQLITE_PATH')
+            or Path(os.getenv('DASH_DATA_DIR') or './data') / 'dash.sqlite3'
+        )
+        self._path.parent.mkdir(
+            mode=0o700,
+            exist_ok=True,
+            parents=True,
+        )
+
+        # Share the idle connections by all (streamlit) threads, as a new
+        # thread is usually started for every rerun
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(
+            maxsize=int(os.getenv('DASH_STORAGE_SQLITE_POOL_SIZE') or '8'),
+        )
+        # The connection of the transaction of the current thread, if any
+        self._local = threading.local()
+
+        with self._connection() as conn:
+            # Persisted in the database file; set once
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS objects (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID
+            ''')
+
+    def __reduce__(self):
+        return ()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._path,
+            timeout=float(
+                os.getenv('DASH_STORAGE_SQLITE_TIMEOUT') or '30',
+            ),
+            # Used by a single thread at a time, via the pool
+            check_same_thread=False,
+        )
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        # Stay within the transaction of the current thread, if any
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _query(self, sql: str, parameters: Iterable[Any]) -> list[tuple]:
+        with self._connection() as conn:
+            return conn.execute(sql, tuple(parameters)).fetchall()
+
+    @contextmanager
+    def lock(self, namespace: str, key: str) -> Iterator[None]:
+        # The database has a single writer; take it for the whole cycle
+        with self._transaction():
+            yield
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        with self._connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            self._local.conn = conn
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                self._local.conn = None
+
+    def list_many(self, namespaces: Iterable[str]) -> dict[str, list[str]]:
+        keys = {
+            namespace: []
+            for namespace in namespaces
+        }
+        for chunk in _chunks(keys):
+            for namespace, key in self._query(
+                f'''
+                SELECT namespace, key FROM objects
+                WHERE namespace IN ({', '.join('?' * len(chunk))})
+                ORDER BY namespace, key
+                ''',
+                chunk,
+            ):
+                keys[namespace].append(key)
+        return keys
+
+    def list_prefix(self, prefix: str) -> list[tuple[str, str]]:
+        prefix = prefix.rstrip('/')
+        return self._query(
+            '''
+            SELECT namespace, key FROM objects
+            WHERE namespace = ? OR (namespace >= ? AND namespace < ?)
+            ORDER BY namespace, key
+            ''',
+            (prefix, f'{prefix}/', f'{prefix}/\U0010ffff'),
+        )
+
+    def get_many(
+        self, namespace: str, keys: Iterable[str],
+    ) -> dict[str, Optional[bytes]]:
+        values: dict[str, Optional[bytes]] = dict.fromkeys(keys)
+        for chunk in _chunks(values):
+            values.update(self._query(
+                f'''
+                SELECT key, value FROM objects
+                WHERE namespace = ? AND key IN ({', '.join('?' * len(chunk))})
+                ''',
+                [namespace, *chunk],
+            ))
+        return values
+
+    def set_many(
+        self, namespace: str, values: dict[str, Optional[Union[bytes, str]]],
+    ) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            for key, value in values.items():
+                if isinstance(value, str):
+                    value = value.encode('utf-8')
+                if isinstance(value, bytes):
+                    conn.execute(
+                        '''
+                        INSERT OR REPLACE INTO objects
+                            (namespace, key, value, size, mtime)
+                        VALUES (?, ?, ?, ?, ?)
+                        ''',
+                        (namespace, key, value, len(value), now),
+                    )
+                else:
+                    conn.execute(
+                        'DELETE FROM objects WHERE namespace = ? AND key = ?',
+                        (namespace, key),
+                    )
+
+    def list(self, namespace: str) -> list[str]:
+        return [
+            key
+            for (key,) in self._query(
+                'SELECT key FROM objects WHERE namespace = ? ORDER BY key',
+                (namespace,),
+            )
+        ]
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        rows = self._query(
+            'SELECT value FROM objects WHERE namespace = ? AND key = ?',
+            (namespace, key),
+        )
+        return rows[0][0] if rows else None
+
+    def set(self, namespace: str, key: str, value: Optional[Union[bytes, str]]) -> None:
+        return self.set_many(namespace, {key: value})
+
+    def stat(self, namespace: str, key: str) -> Optional[StorageStat]:
+        rows = self._query(
+            'SELECT size, mtime FROM objects WHERE namespace = ? AND key = ?',
+            (namespace, key),
+        )
+        return StorageStat(*rows[0]) if rows else None
+
+
+def _chunks(items: Iterable[str], size: int = 500) -> Iterable[list[str]]:
+    # Stay below the maximum number of SQL variables
+    items = list(items)
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
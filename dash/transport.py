@@ -0,0 +1,235 @@
+import os
+import random
+import threading
+import time
+from typing import Any
+
+import requests
+import urllib3
+
+from dash.cache import ResponseCache, Unavailable
+
+
+class CircuitOpenError(Unavailable):
+    pass
+
+
+class StatusError(Exception):
+    def __init__(self, message: str, *, status_code: int) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitBreaker:
+    '''
+    Fails fast once the API has been unreachable ``threshold`` times in a
+    row.
+
+    After ``cooldown`` seconds, a single probe request is let through; the
+    circuit closes again as soon as a request succeeds.
+    '''
+
+    def __init__(
+        self, *,
+        threshold: int | None = None,
+        cooldown: float | None = None,
+    ) -> None:
+        self._threshold = threshold or int(
+            os.environ.get('DASH_HTTP_BREAKER_THRESHOLD') or '5',
+        )
+        self._cooldown = cooldown or float(
+            os.environ.get('DASH_HTTP_BREAKER_COOLDOWN') or '30',
+        )
+
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if not self._probing \
+                    and time.monotonic() - self._opened_at >= self._cooldown:
+                self._probing = True
+                return
+        raise CircuitOpenError('DASH API is unavailable')
+
+    def release(self) -> None:
+        '''
+        Lets another probe through, if the request has told nothing.
+        '''
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self._threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class RetryBudget:
+    '''
+    Bounds the retries to a ratio of the requests, shared by all callers.
+
+    Every request deposits ``ratio`` tokens and every retry withdraws one,
+    so that retries cannot multiply the load of an already struggling API.
+    '''
+
+    def __init__(
+        self, *,
+        ratio: float | None = None,
+        capacity: float | None = None,
+    ) -> None:
+        self._ratio = ratio or float(
+            os.environ.get('DASH_HTTP_RETRY_RATIO') or '0.1',
+        )
+        self._capacity = capacity or float(
+            os.environ.get('DASH_HTTP_RETRY_CAPACITY') or '10',
+        )
+
+        self._balance = self._capacity
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._balance = min(self._capacity, self._balance + self._ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._balance < 1.0:
+                return False
+            self._balance -= 1.0
+            return True
+
+
+class Transport:
+    '''
+    A pooled HTTP transport with timeouts, retries and a circuit breaker.
+
+    Only the idempotent methods are retried, with a jittered exponential
+    backoff and within the shared ``RetryBudget``.
+    '''
+
+    IDEMPOTENT_METHODS = ['GET', 'OPTION']
+    RETRY_STATUS_CODES = [429, 502, 503, 504]
+    # Only these mean that the API itself is unhealthy; any other error
+    # (e.g. a 500 of a broken function) is specific to the request
+    FAILURE_STATUS_CODES = [502, 503, 504]
+    # Rejected before being processed, so even a non-idempotent call is safe
+    NOT_PROCESSED_STATUS_CODES = [429, 503]
+
+    def __init__(self, *, pool_size: int | None = None) -> None:
+        self._connect_timeout = float(
+            os.environ.get('DASH_HTTP_CONNECT_TIMEOUT') or '3.05',
+        )
+        self._read_timeout = float(
+            os.environ.get('DASH_HTTP_READ_TIMEOUT') or '30',
+        )
+        # Per endpoint family, e.g. `DASH_HTTP_READ_TIMEOUT_JOB`
+        self._timeouts = {
+            family: (
+                float(
+                    os.environ.get(f'DASH_HTTP_CONNECT_TIMEOUT_{family.upper()}')
+                    or self._connect_timeout
+                ),
+                float(
+                    os.environ.get(f'DASH_HTTP_READ_TIMEOUT_{family.upper()}')
+                    or self._read_timeout
+                ),
+            )
+            for family in ResponseCache.FAMILIES
+        }
+        self._max_retries = int(
+            os.environ.get('DASH_HTTP_MAX_RETRIES') or '2',
+        )
+        self._backoff = float(
+            os.environ.get('DASH_HTTP_RETRY_BACKOFF') or '0.2',
+        )
+
+        # A single pool of keep-alive connections to the API host, shared by
+        # all (streamlit) threads
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=int(
+                os.environ.get('DASH_HTTP_POOL_SIZE') or pool_size or '32',
+            ),
+        )
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        self._breaker = CircuitBreaker()
+        self._budget = RetryBudget()
+
+    def timeout(self, path: str) -> tuple[float, float]:
+        return self._timeouts.get(
+            ResponseCache.family(path) or '',
+            (self._connect_timeout, self._read_timeout),
+        )
+
+    def request(
+        self, *, method: str, url: str, path: str,
+        headers: dict[str, str | None], json: Any,
+    ) -> requests.Response:
+        is_idempotent = method in self.IDEMPOTENT_METHODS
+        self._budget.deposit()
+
+        attempt = 0
+        while True:
+            self._breaker.acquire()
+            try:
+                response = self._session.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    json=json,
+                    timeout=self.timeout(path),
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                self._breaker.record_failure()
+                if not self._should_retry(is_idempotent, attempt):
+                    raise
+            except BaseException:
+                self._breaker.release()
+                raise
+            else:
+                if response.status_code in self.FAILURE_STATUS_CODES:
+                    self._breaker.record_failure()
+                else:
+                    self._breaker.record_success()
+                if response.status_code not in self.RETRY_STATUS_CODES \
+                        or not self._should_retry(is_idempotent, attempt):
+                    return response
+
+            attempt += 1
+            time.sleep(random.uniform(0, self._backoff * 2 ** attempt))
+
+    @classmethod
+    def is_not_processed(cls, error: BaseException) -> bool:
+        '''
+        Returns whether the failed request has provably not reached the API.
+        '''
+        if isinstance(error, (CircuitOpenError, requests.ConnectTimeout)):
+            return True
+        if isinstance(error, StatusError):
+            return error.status_code in cls.NOT_PROCESSED_STATUS_CODES
+        if isinstance(error, requests.ConnectionError):
+            # The connection could not be established at all
+            reason = getattr(error.args[0] if error.args else None, 'reason', None)
+            return isinstance(reason, urllib3.exceptions.NewConnectionError)
+        return False
+
+    def _should_retry(self, is_idempotent: bool, attempt: int) -> bool:
+        return is_idempotent \
+            and attempt < self._max_retries \
+            and self._budget.withdraw()
@@ -0,0 +1,67 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import pytest
+
+from dash.cache import ResponseCache
+from dash.client import DashClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    ETAG = '"v1"'
+    requests: list[dict[str, str]] = []
+
+    def do_GET(self) -> None:
+        type(self).requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == self.ETAG:
+            self.send_response(304)
+            self.send_header('ETag', self.ETAG)
+            self.end_headers()
+            return
+
+        body = json.dumps({'spec': {'name': 'foo'}}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', self.ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    monkeypatch.setenv('DASH_HOST', f'http://127.0.0.1:{server.server_port}')
+    client = object.__new__(DashClient)
+    client._setup()
+    # Revalidate on every call
+    client._cache = ResponseCache(default_ttl=1e-9, stale_ttl=1e-9)
+    return client
+
+
+def test_not_modified_reuses_the_decoded_value(client):
+    first = client._call_raw(method='GET', path='/foo/')
+    second = client._call_raw(method='GET', path='/foo/')
+
+    assert first == {'name': 'foo'}
+    assert second is first
+
+    assert len(_Handler.requests) == 2
+    assert 'If-None-Match' not in _Handler.requests[0]
+    assert _Handler.requests[1]['If-None-Match'] == _Handler.ETAG
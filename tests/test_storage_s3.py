@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+import uuid
+
+import pytest
+
+pytest.importorskip('s3fs')
+moto_server = pytest.importorskip('moto.server')
+
+from dash.storage.s3 import S3Storage
+
+
+@pytest.fixture(scope='module')
+def endpoint():
+    server = moto_server.ThreadedMotoServer(ip_address='127.0.0.1', port=0)
+    server.start()
+    try:
+        host, port = server.get_host_and_port()
+        yield f'http://{host}:{port}'
+    finally:
+        server.stop()
+
+
+@pytest.fixture
+def new_storage(endpoint, monkeypatch):
+    import boto3
+
+    bucket = f'dash-{uuid.uuid4().hex[:12]}'
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    boto3.client('s3', endpoint_url=endpoint).create_bucket(Bucket=bucket)
+
+    monkeypatch.setenv('DASH_STORAGE_S3_BUCKET', bucket)
+    monkeypatch.setenv('DASH_STORAGE_S3_ENDPOINT', endpoint)
+
+    def new_storage(**env: str) -> S3Storage:
+        for name, value in env.items():
+            monkeypatch.setenv(f'DASH_STORAGE_S3_{name.upper()}', value)
+        return S3Storage()
+
+    return new_storage
+
+
+def test_list_get_set_delete(new_storage):
+    storage = new_storage()
+    assert storage.list('/user/_/template') == []
+    assert storage.get('/user/_/template', 'foo') is None
+
+    storage.set('/user/_/template', 'foo', 'bar')
+    storage.set_many('/user/_/template', {'baz': b'qux', 'ünï': 'code'})
+    assert sorted(storage.list('/user/_/template')) == ['baz', 'foo', 'ünï']
+    assert storage.get('/user/_/template', 'foo') == b'bar'
+    assert storage.get_many('/user/_/template', ['baz', 'none']) == {
+        'baz': b'qux',
+        'none': None,
+    }
+    assert storage.stat('/user/_/template', 'foo').size == 3
+
+    storage.set('/user/_/template', 'foo', None)
+    assert sorted(storage.list('/user/_/template')) == ['baz', 'ünï']
+    assert storage.get('/user/_/template', 'foo') is None
+    assert storage.list_prefix('/user') == [
+        ('/user/_/template', 'baz'),
+        ('/user/_/template', 'ünï'),
+    ]
+
+
+def test_unchanged_object_is_revalidated_by_etag(new_storage):
+    # Revalidate on every read
+    storage = new_storage(cache_ttl='0')
+    writer = new_storage()
+    writer.set('/user/_/template', 'foo', 'bar')
+
+    downloads = []
+    open = storage._fs.open
+
+    def counted_open(path, *args, **kwargs):
+        downloads.append(path)
+        return open(path, *args, **kwargs)
+
+    storage._fs.open = counted_open
+
+    assert storage.get('/user/_/template', 'foo') == b'bar'
+    assert storage.get('/user/_/template', 'foo') == b'bar'
+    storage.list('/user/_/template')
+    assert storage.get('/user/_/template', 'foo') == b'bar'
+    assert len(downloads) == 1
+
+    writer.set('/user/_/template', 'foo', 'baz')
+    assert storage.get('/user/_/template', 'foo') == b'baz'
+    assert len(downloads) == 2
+
+
+def test_lock_is_exclusive_across_instances(new_storage):
+    storage = new_storage(lock_timeout='0.5')
+    other = new_storage()
+
+    with storage.lock('/user/_/template', 'foo'):
+        # Reentrant within the thread
+        with storage.lock('/user/_/template', 'foo'):
+            pass
+
+        with pytest.raises(TimeoutError):
+            with other.lock('/user/_/template', 'foo'):
+                pass
+
+    with other.lock('/user/_/template', 'foo'):
+        pass
+
+
+def test_stale_lock_is_broken(new_storage):
+    storage = new_storage(lock_ttl='0', lock_timeout='5')
+    bucket, key = f'{storage._get_file("/user/_/template", "foo")[:-4]}.lock' \
+        .split('/', 1)
+    # Left by a crashed replica
+    storage._fs.pipe(f'{bucket}/{key}', b'')
+
+    with storage.lock('/user/_/template', 'foo'):
+        pass
+
+
+def test_concurrent_manifest_updates(new_storage):
+    storages = [new_storage(), new_storage()]
+    barrier = threading.Barrier(8)
+
+    def write(index: int) -> None:
+        storage = storages[index % len(storages)] \
+            .namespaced(f'/user/ns{index % 3}/template')
+        barrier.wait()
+        for offset in range(3):
+            storage.set(f'key{index}-{offset}', 'value')
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(write, range(8)))
+
+    manifest = json.loads(storages[0].get_uncached('/.manifest', 'user'))
+    assert sum(map(len, manifest.values())) == 8 * 3
+    assert manifest == storages[1].get_manifest('user')
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+
+import pytest
+
+from dash.storage.sqlite import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setenv('DASH_STORAGE_SQLITE_PATH', str(tmp_path / 'dash.sqlite3'))
+    return SQLiteStorage()
+
+
+def test_list_get_set_delete(storage):
+    storage.set('/user/_/template', 'foo', 'bar')
+    storage.set_many('/user/_/template', {'baz': b'qux'})
+    assert storage.list('/user/_/template') == ['baz', 'foo']
+    assert storage.get('/user/_/template', 'foo') == b'bar'
+    assert storage.stat('/user/_/template', 'foo').size == 3
+
+    storage.set('/user/_/template', 'foo', None)
+    assert storage.get('/user/_/template', 'foo') is None
+    assert storage.list_prefix('/user') == [('/user/_/template', 'baz')]
+
+
+def test_connections_are_shared_by_threads(storage, monkeypatch):
+    connect = storage._connect
+    connections = []
+    monkeypatch.setattr(
+        storage, '_connect',
+        lambda: connections.append(connect()) or connections[-1],
+    )
+
+    # A new thread per rerun
+    for index in range(10):
+        thread = threading.Thread(
+            target=storage.set,
+            args=('/user/_/template', f'key{index}', 'value'),
+        )
+        thread.start()
+        thread.join()
+    assert len(storage.list('/user/_/template')) == 10
+    assert len(connections) <= 1
+
+
+def test_concurrent_manifest_updates(storage):
+    def write(index: int) -> None:
+        namespaced = storage.namespaced(f'/user/ns{index % 3}/template')
+        for offset in range(5):
+            namespaced.set(f'key{index}-{offset}', 'value')
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(write, range(8)))
+
+    manifest = json.loads(storage.get('/.manifest', 'user'))
+    assert sum(map(len, manifest.values())) == 8 * 5